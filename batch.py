@@ -0,0 +1,67 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from scanner import Scanner
+from parser import Parser
+from resolver import SlotInterpreter
+
+
+def run_program(path):
+    # Runs in a worker process; every program gets its own interpreter.
+    try:
+        with open(path, 'r') as f:
+            text = f.read()
+        interpreter = SlotInterpreter(Parser(Scanner(text)))
+        interpreter.interpret()
+        return {'file': path, 'scope': interpreter.GLOBAL_SCOPE}
+    except Exception as e:
+        return {'file': path, 'error': '{}: {}'.format(type(e).__name__, e)}
+
+
+def collect(sources, manifest=None, pattern='*.pas'):
+    paths = []
+    if manifest is not None:
+        with open(manifest, 'r') as f:
+            paths.extend(line.strip() for line in f if line.strip())
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, pattern))))
+        elif glob.has_magic(source):
+            paths.extend(sorted(glob.glob(source)))
+        else:
+            paths.append(source)
+    return paths
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Run many Pascal programs in parallel')
+    argparser.add_argument('sources', nargs='*',
+                           help='program files, directories or glob patterns')
+    argparser.add_argument('--manifest', help='file listing one program path per line')
+    argparser.add_argument('--pattern', default='*.pas',
+                           help='file pattern used inside directories')
+    argparser.add_argument('--workers', type=int, default=os.cpu_count())
+    argparser.add_argument('--chunksize', type=int, default=64,
+                           help='programs handed to a worker at a time')
+    args = argparser.parse_args()
+
+    paths = collect(args.sources, args.manifest, args.pattern)
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for result in executor.map(run_program, paths, chunksize=args.chunksize):
+            if 'error' in result:
+                failed += 1
+            print(json.dumps(result))
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    print('{} programs ({} failed) in {:.2f}s: {:.0f} programs/s'.format(
+        len(paths), failed, elapsed, len(paths) / elapsed if elapsed else 0), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from calc2 import Lexer, Parser, Interpreter
+from vectorize import Formula, np
+
+FORMULA = '(price * quantity - discount) / (1 + rate) * 100'
+
+
+def make_columns(rows):
+    rng = random.Random(42)
+    names = ('price', 'quantity', 'discount', 'rate')
+    if np is not None:
+        generator = np.random.default_rng(42)
+        return {name: generator.random(rows) for name in names}
+    return {name: [rng.random() for _ in range(rows)] for name in names}
+
+
+def per_row(columns, rows):
+    # the old way: re-parse and re-walk the tree for every row
+    result = []
+    for i in range(rows):
+        variables = {name: column[i] for name, column in columns.items()}
+        result.append(Interpreter(Parser(Lexer(FORMULA)), variables).interpret())
+    return result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    columns = make_columns(rows)
+    print('{} rows, {}'.format(rows, 'numpy ' + np.__version__ if np is not None else 'pure Python fallback'))
+
+    sample = min(rows, 20000)
+    start = time.perf_counter()
+    per_row({name: column[:sample] for name, column in columns.items()}, sample)
+    elapsed = time.perf_counter() - start
+    print('per row:  {:14.0f} rows/s (sampled on {} rows)'.format(sample / elapsed, sample))
+
+    formula = Formula(FORMULA)
+    start = time.perf_counter()
+    formula.evaluate(columns)
+    elapsed = time.perf_counter() - start
+    print('batch:    {:14.0f} rows/s'.format(rows / elapsed))
+
+
+if __name__ == '__main__':
+    main()
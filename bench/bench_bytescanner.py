@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from bytescanner import ByteScanner
+from bench_lexer import make_program, drain
+
+
+def str_scanner(data):
+    return drain(Scanner(data.decode('utf-8')))
+
+
+def byte_scanner(data):
+    return drain(ByteScanner(data))
+
+
+def byte_spans(data):
+    count = -1
+    for _ in ByteScanner(data).spans():
+        count += 1
+    return count
+
+
+def str_parser(data):
+    return Parser(Scanner(data.decode('utf-8'))).parse()
+
+
+def byte_parser(data):
+    return Parser(ByteScanner(data)).parse()
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    data = make_program(statements).encode('utf-8')
+    print('source: {:.1f} MB, {} statements'.format(len(data) / 1e6, statements))
+    for name, run in (('decode + Scanner', str_scanner),
+                      ('ByteScanner tokens', byte_scanner),
+                      ('ByteScanner spans', byte_spans)):
+        start = time.perf_counter()
+        count = run(data)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        run(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{:20} {:8.3f}s {:10.0f} tokens/s {:8.2f} MB peak'.format(name, elapsed, count / elapsed, peak / 1e6))
+    # parsing reads names but no number, so those stay undecoded
+    for name, run in (('decode + Parser', str_parser),
+                      ('ByteScanner + Parser', byte_parser)):
+        start = time.perf_counter()
+        run(data)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        tree = run(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print('{:20} {:8.3f}s {:>19} {:8.2f} MB peak'.format(name, elapsed, '', peak / 1e6))
+        del tree
+
+
+if __name__ == '__main__':
+    main()
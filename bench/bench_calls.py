@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from resolver import SlotInterpreter
+
+
+def call_tree_program(depth, fanout):
+    # Without IF a recursive procedure never stops, so recursion like fib
+    # cannot be written; instead Level0 calls Level1 fanout times, and so
+    # on down to a leaf function, for fanout ** depth leaf calls.
+    lines = ['PROGRAM CallTree;', 'VAR total : INTEGER;', '',
+             'FUNCTION Leaf(a, b : INTEGER) : INTEGER;',
+             'BEGIN', '  Leaf := a * 2 + b', 'END;', '']
+    for level in range(depth - 1, -1, -1):
+        callee = 'Level{}(n + {{}})'.format(level + 1) if level + 1 < depth else 'total := total + Leaf(n, {})'
+        lines.append('PROCEDURE Level{}(n : INTEGER);'.format(level))
+        lines.append('BEGIN')
+        lines.append(';\n'.join('  ' + callee.format(i) for i in range(fanout)))
+        lines.append('END;')
+        lines.append('')
+    lines.append('BEGIN')
+    lines.append('  total := 0;')
+    lines.append('  Level0(1)')
+    lines.append('END.')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    fanout = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    tree = Parser(Scanner(call_tree_program(depth, fanout))).parse()
+    calls = sum(fanout ** level for level in range(depth + 1))
+    interpreter = SlotInterpreter(None)
+    start = time.perf_counter()
+    interpreter.execute(tree)
+    elapsed = time.perf_counter() - start
+    print('depth {} fanout {}: {} calls in {:.3f}s, {:.0f} calls/s (total = {})'.format(
+        depth, fanout, calls, elapsed, calls / elapsed, interpreter.GLOBAL_SCOPE['total']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from generate import ProgramGenerator
+from scanner import Scanner
+from parser import Parser
+from resolver import SlotInterpreter
+from compiler import compile_tree
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main():
+    # Compiling costs more than one interpreted run, and pays off from
+    # the runs after it: the function compile_tree returns can be re-run.
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    tree = Parser(Scanner(ProgramGenerator(statements).program())).parse()
+
+    interpreter = SlotInterpreter(None)
+    interpret = min(timed(lambda: interpreter.execute(tree))[0] for _ in range(repeat))
+    compile_seconds, program = timed(lambda: compile_tree(tree))
+    rerun, scope = min((timed(program) for _ in range(repeat)), key=lambda pair: pair[0])
+    # by repr, since long generated programs reach nan
+    assert repr(scope) == repr(interpreter.GLOBAL_SCOPE)
+
+    print('{} statements, best of {}'.format(statements, repeat))
+    print('SlotInterpreter.execute  {:8.3f}s'.format(interpret))
+    print('compile_tree             {:8.3f}s'.format(compile_seconds))
+    print('compiled re-run          {:8.3f}s  ({:.1f}x)'.format(rerun, interpret / rerun))
+    print('runs before compiling pays off: {:.1f}'.format(compile_seconds / (interpret - rerun)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from optimizer import count_nodes
+from cse import HashConsingParser, CSEInterpreter
+
+
+def redundant_program(statements):
+    # a few variables and the same handful of subexpressions over and over;
+    # only every fourth statement changes an input
+    common = '(a * b + c / 3) * (a - b)'
+    lines = ['a := 3', 'b := 5', 'c := 7']
+    for i in range(statements):
+        if i % 4 == 0:
+            lines.append('a := a + 1 - (a - 1) + {}'.format(i % 3))
+        lines.append('r{} := {} + {} * 2 - ({} - c)'.format(i % 20, common, common, common))
+    return 'BEGIN\n' + ';\n'.join(lines) + '\nEND.\n'
+
+
+def run(parser_class, interpreter_class, text):
+    tracemalloc.start()
+    tree = parser_class(Scanner(text)).parse()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    interpreter = interpreter_class(None)
+    start = time.perf_counter()
+    if interpreter_class is CSEInterpreter:
+        interpreter.execute(tree)
+    else:
+        interpreter.visit(tree)
+    return size, time.perf_counter() - start, interpreter
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    text = redundant_program(statements)
+    tree_size, tree_time, tree = run(Parser, Interpreter, text)
+    dag_size, dag_time, dag = run(HashConsingParser, CSEInterpreter, text)
+    assert tree.GLOBAL_SCOPE == dag.GLOBAL_SCOPE
+    print('{} statements, {} tree nodes'.format(statements, count_nodes(Parser(Scanner(text)).parse())))
+    print('tree: {:8.1f} MB AST {:8.3f}s eval'.format(tree_size / 1e6, tree_time))
+    print('dag:  {:8.1f} MB AST {:8.3f}s eval  ({} hits, {} misses)'.format(
+        dag_size / 1e6, dag_time, dag.hits, dag.misses))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from iterparser import IterativeParser, IterativeInterpreter
+
+
+def nested_parens(depth):
+    return 'BEGIN a := {}1{} END.'.format('(' * depth, ')' * depth)
+
+
+def negations(depth):
+    return 'BEGIN x := 3; a := x {} x END.'.format('- ' * depth)
+
+
+def run(parser_class, interpreter_class, text):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        tree = parser_class(Scanner(text)).parse()
+        interpreter_class(None).visit(tree)
+        outcome = 'ok'
+    except RecursionError:
+        outcome = 'RecursionError'
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return outcome, elapsed, peak
+
+
+def main():
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    depth = 10
+    while depth <= max_depth:
+        for shape in (nested_parens, negations):
+            text = shape(depth)
+            for name, parser_class, interpreter_class in (
+                    ('recursive', Parser, Interpreter),
+                    ('iterative', IterativeParser, IterativeInterpreter)):
+                outcome, elapsed, peak = run(parser_class, interpreter_class, text)
+                print('{:>8} {:14} {:10} {:15} {:8.3f}s {:8.1f} MB peak'.format(
+                    depth, shape.__name__, name, outcome, elapsed, peak / 1e6))
+        depth *= 10
+
+
+if __name__ == '__main__':
+    main()
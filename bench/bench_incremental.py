@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from incremental import IncrementalProgram
+
+
+def make_program(lines):
+    rng = random.Random(42)
+    statements = ['v0 := 1']
+    for i in range(1, lines):
+        statements.append('v{} := v{} * 3 + {}'.format(i, rng.randrange(i), i))
+    return 'BEGIN\n' + ';\n'.join(statements) + '\nEND.\n'
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    text = make_program(lines)
+
+    start = time.perf_counter()
+    program = IncrementalProgram(text)
+    print('{} lines: full run {:.3f}s'.format(lines, time.perf_counter() - start))
+
+    offsets = [0]
+    for i in range(lines):
+        offsets.append(text.index('\n', offsets[-1]) + 1)
+    offsets.pop(0)
+
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(edits):
+        # change the constant at the end of a random line
+        line = rng.randrange(1, lines)
+        pos = program.text.index(';\n' if line < lines - 1 else '\nEND', offsets[line])
+        start = time.perf_counter()
+        program.edit(pos - 1, pos, str(rng.randrange(10)))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print('single-line edit: p50 {:.3f} ms, p99 {:.3f} ms, max {:.3f} ms'.format(
+        latencies[len(latencies) // 2] * 1000,
+        latencies[len(latencies) * 99 // 100] * 1000,
+        latencies[-1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from resolver import SlotInterpreter
+from lazy import LazyInterpreter
+
+
+def chains_program(variables, statements):
+    # independent update chains; a query for one variable needs one chain
+    lines = ['v{} := {}'.format(i, i) for i in range(variables)]
+    for i in range(statements):
+        name = 'v{}'.format(i % variables)
+        lines.append('{} := {} * 3 / 2 - {} + {}'.format(name, name, name, i % 7))
+    return 'BEGIN\n' + ';\n'.join(lines) + '\nEND.\n'
+
+
+def run(make_interpreter, tree):
+    interpreter = make_interpreter()
+    start = time.perf_counter()
+    interpreter.execute(tree)
+    elapsed = time.perf_counter() - start
+    # a second run for memory, since tracing slows everything down
+    tracemalloc.start()
+    make_interpreter().execute(tree)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return interpreter, elapsed, peak
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    variables = 100
+    tree = Parser(Scanner(chains_program(variables, statements))).parse()
+    full, elapsed, peak = run(lambda: SlotInterpreter(None), tree)
+    print('all variables: {:8.3f}s {:8.2f} MB peak'.format(elapsed, peak / 1e6))
+    for count in (1, 10, variables):
+        names = ['v{}'.format(i) for i in range(count)]
+        lazy, elapsed, peak = run(lambda: LazyInterpreter(None, names), tree)
+        assert lazy.GLOBAL_SCOPE == {name: full.GLOBAL_SCOPE[name] for name in names}
+        print('--vars x{:<4}  {:8.3f}s {:8.2f} MB peak  ({} assignments forced)'.format(
+            count, elapsed, peak / 1e6, lazy.forced))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from tokens import Tokens
+from lexer import Lexer
+from scanner import Scanner
+
+
+def make_program(statements):
+    lines = ['BEGIN']
+    for i in range(statements):
+        lines.append('    variable{0} := (variable{1} + {0}) * 42 - number / 7;'.format(i, i // 2))
+    lines.append('    x := 11')
+    lines.append('END.')
+    return '\n'.join(lines)
+
+
+def drain(lexer):
+    count = 0
+    token = lexer.get_next_token()
+    while token.type != Tokens.EOF:
+        count += 1
+        token = lexer.get_next_token()
+    return count
+
+
+def timed(cls, text):
+    start = time.perf_counter()
+    count = drain(cls(text))
+    return count, time.perf_counter() - start
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text = make_program(statements)
+    print('source: {:.1f} MB, {} statements'.format(len(text) / 1e6, statements))
+    results = {}
+    for cls in (Lexer, Scanner):
+        count, elapsed = timed(cls, text)
+        results[cls.__name__] = elapsed
+        print('{:8} {:>9} tokens {:8.3f}s {:12.0f} tokens/s'.format(
+            cls.__name__, count, elapsed, count / elapsed))
+    print('speedup: {:.1f}x'.format(results['Lexer'] / results['Scanner']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from optimizer import count_nodes
+
+
+def make_program(statements):
+    lines = ['BEGIN']
+    for i in range(statements):
+        lines.append('    v{0} := (v{1} + {0}) * 42 - -number / 7;'.format(i, i // 2))
+    lines.append('    x := 11')
+    lines.append('END.')
+    return '\n'.join(lines)
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = make_program(statements)
+    parser = Parser(Scanner(text))
+    tracemalloc.start()
+    tree = parser.parse()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = count_nodes(tree)
+    print('{} nodes: {:.1f} MB retained, {:.1f} MB peak, {:.0f} bytes/node'.format(
+        nodes, current / 1e6, peak / 1e6, current / nodes))
+
+
+if __name__ == '__main__':
+    main()
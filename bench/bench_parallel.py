@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from resolver import SlotInterpreter
+from deps import ParallelInterpreter, Schedule
+
+
+def wide_program(variables, rounds, dead):
+    # Each round is two levels of independent statements: every w reads the
+    # v of the previous round, then every v reads its w. Before its live
+    # assignment each w is assigned dead times more and never read.
+    lines = ['v{} := {}'.format(i, i + 1) for i in range(variables)]
+    for r in range(rounds):
+        for i in range(variables):
+            for d in range(dead):
+                lines.append('w{} := v{} * {} + {}'.format(i, i, d + 2, r))
+            lines.append('w{} := v{} * 2 - v{} * 3 + {}'.format(i, i, (i + 1) % variables, r))
+        for i in range(variables):
+            lines.append('v{0} := w{0} / 7 + 1'.format(i))
+    return 'BEGIN\n' + ';\n'.join(lines) + '\nEND.\n'
+
+
+def timed(interpreter, tree):
+    start = time.perf_counter()
+    interpreter.execute(tree)
+    return interpreter, time.perf_counter() - start
+
+
+def main():
+    variables = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    tree = Parser(Scanner(wide_program(variables, 5, 3))).parse()
+    start = time.perf_counter()
+    schedule = Schedule(tree)
+    print('{} statements, {} dead, {} levels, scheduled in {:.3f}s'.format(
+        len(schedule.statements), len(schedule.dead), len(schedule.levels), time.perf_counter() - start))
+    start = time.perf_counter()
+    Interpreter(None).visit(tree)
+    print('tree walker             {:8.3f}s'.format(time.perf_counter() - start))
+    sequential, baseline = timed(SlotInterpreter(None), tree)
+    print('slots (baseline)        {:8.3f}s'.format(baseline))
+    for processes in (False, True):
+        workers = 1
+        while workers <= max_workers:
+            parallel, elapsed = timed(ParallelInterpreter(None, workers, batch=256, processes=processes), tree)
+            assert parallel.GLOBAL_SCOPE == sequential.GLOBAL_SCOPE
+            print('{:9} x{:<3}          {:8.3f}s  {:5.2f}x'.format(
+                'processes' if processes else 'threads', workers, elapsed, baseline / elapsed))
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from tokenstream import BufferedParser
+from parscan import tokenize_file
+from bench_lexer import make_program
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    with tempfile.NamedTemporaryFile('w', suffix='.pas', delete=False) as f:
+        f.write(make_program(statements))
+        path = f.name
+    try:
+        print('source: {:.1f} MB, {} statements'.format(os.path.getsize(path) / 1e6, statements))
+        baseline = None
+        workers = 1
+        while workers <= max_workers:
+            start = time.perf_counter()
+            buffer = tokenize_file(path, workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print('{:3} workers {:8.3f}s {:10.0f} tokens/s  {:5.2f}x'.format(
+                workers, elapsed, len(buffer) / elapsed, baseline / elapsed))
+            workers *= 2
+        start = time.perf_counter()
+        BufferedParser(buffer).parse()
+        print('BufferedParser {:8.3f}s'.format(time.perf_counter() - start))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from generate import ProgramGenerator
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from resolver import Resolver, SlotInterpreter
+
+
+def best(runs, repeat):
+    # interleaved, so a noisy spell slows every variant alike
+    times = [float('inf')] * len(runs)
+    for _ in range(repeat):
+        for index, run in enumerate(runs):
+            start = time.perf_counter()
+            run()
+            times[index] = min(times[index], time.perf_counter() - start)
+    return times
+
+
+def main():
+    # One run of one parsed tree, as main.py does: the dict interpreter
+    # against the resolve pass plus the slot interpreter.
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    tree = Parser(Scanner(ProgramGenerator(statements).program())).parse()
+
+    dict_scope = Interpreter(None)
+    dict_scope.visit(tree)
+    slot_scope = SlotInterpreter(None)
+    slot_scope.execute(tree)
+    # by repr, since long generated programs reach nan
+    assert repr(slot_scope.GLOBAL_SCOPE) == repr(dict_scope.GLOBAL_SCOPE)
+
+    baseline, resolve, execute = best([
+        lambda: Interpreter(None).visit(tree),
+        lambda: Resolver().resolve(tree),
+        lambda: SlotInterpreter(None).execute(tree),
+    ], repeat)
+    print('{} statements, best of {}'.format(statements, repeat))
+    print('dict Interpreter         {:8.3f}s'.format(baseline))
+    print('Resolver alone           {:8.3f}s'.format(resolve))
+    print('SlotInterpreter.execute  {:8.3f}s  ({:.2f}x)'.format(execute, baseline / execute))
+
+
+if __name__ == '__main__':
+    main()
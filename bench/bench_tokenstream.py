@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from scanner import Scanner
+from parser import Parser
+from tokenstream import tokenize, BufferedParser
+from bench_lexer import make_program
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    text = make_program(statements)
+
+    # interleaved best of repeat, so a noisy spell slows both alike
+    streaming = buffered = lexed = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Parser(Scanner(text)).parse()
+        streaming = min(streaming, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        buffer = tokenize(text)
+        lexed = min(lexed, time.perf_counter() - start)
+        BufferedParser(buffer).parse()
+        buffered = min(buffered, time.perf_counter() - start)
+    print('Scanner + Parser:        {:8.3f}s'.format(streaming))
+    print('tokenize + BufferedParser: {:6.3f}s ({:.3f}s lexing {} tokens)'.format(buffered, lexed, len(buffer)))
+    print('speedup: {:.2f}x'.format(streaming / buffered))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import random
+
+
+class ProgramGenerator:
+    def __init__(self, statements=1000, depth=4, variables=50, nesting=2, seed=0):
+        self.statements = statements
+        self.depth = depth
+        self.variables = variables
+        self.nesting = nesting
+        self.rng = random.Random(seed)
+
+    def name(self, index):
+        return 'v{}'.format(index)
+
+    def expr(self, depth):
+        rng = self.rng
+        if depth == 0 or rng.random() < 0.2:
+            if rng.random() < 0.6:
+                return self.name(rng.randrange(self.variables))
+            return str(rng.randrange(1, 100))
+        choice = rng.random()
+        if choice < 0.1:
+            return '-' + self.expr(depth - 1)
+        if choice < 0.25:
+            return '(' + self.expr(depth - 1) + ')'
+        if choice < 0.4:
+            # constant divisors, so generated programs never divide by zero;
+            # DIV would need INTEGER operands, and every variable is REAL
+            return '{} {} {}'.format(self.expr(depth - 1), rng.choice('*/'), rng.randrange(1, 10))
+        return '{} {} {}'.format(self.expr(depth - 1), rng.choice('+-'), self.expr(depth - 1))
+
+    def assignment(self, indent):
+        return '{}{} := {}'.format(indent, self.name(self.rng.randrange(self.variables)), self.expr(self.depth))
+
+    def block(self, count, level, indent):
+        # splits count statements into nested BEGIN ... END blocks
+        lines = []
+        while count > 0:
+            if level < self.nesting and count > 2 and self.rng.random() < 0.3:
+                size = self.rng.randrange(1, count)
+                lines.append('{}BEGIN\n{}\n{}END'.format(indent, self.block(size, level + 1, indent + '  '), indent))
+                count -= size
+            else:
+                lines.append(self.assignment(indent))
+                count -= 1
+        return ';\n'.join(lines)
+
+    def program(self):
+        # all variables are REAL, since '/' may appear anywhere
+        names = [self.name(i) for i in range(self.variables)]
+        lines = ['PROGRAM Bench;', 'VAR']
+        for start in range(0, len(names), 10):
+            lines.append('  {} : REAL;'.format(', '.join(names[start:start + 10])))
+        lines.append('BEGIN {generated}')
+        init = ['  {} := {}'.format(name, i + 1) for i, name in enumerate(names)]
+        lines.append(';\n'.join(init + [self.block(self.statements, 0, '  ')]))
+        lines.append('END.')
+        return '\n'.join(lines) + '\n'
+
+    def expressions(self, count):
+        # for calc1/calc2: no variables, no DIV keyword
+        saved = self.variables
+        self.variables = 0
+        result = []
+        for _ in range(count):
+            result.append(self.calc_expr(self.depth))
+        self.variables = saved
+        return result
+
+    def calc_expr(self, depth):
+        rng = self.rng
+        if depth == 0 or rng.random() < 0.2:
+            return str(rng.randrange(1, 100))
+        if rng.random() < 0.2:
+            return '(' + self.calc_expr(depth - 1) + ')'
+        return '{} {} {}'.format(self.calc_expr(depth - 1), rng.choice('+-*'), self.calc_expr(depth - 1))
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Generate a synthetic Pascal program')
+    argparser.add_argument('--statements', type=int, default=1000)
+    argparser.add_argument('--depth', type=int, default=4, help='maximum expression depth')
+    argparser.add_argument('--variables', type=int, default=50)
+    argparser.add_argument('--nesting', type=int, default=2, help='maximum BEGIN/END nesting')
+    argparser.add_argument('--seed', type=int, default=0)
+    args = argparser.parse_args()
+    print(ProgramGenerator(args.statements, args.depth, args.variables, args.nesting, args.seed).program(), end='')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+PROGRAM = 'BEGIN number := 2; a := number; b := 10 * a + 10 * number / 4; c := a - - b; x := 11 END.'
+
+
+async def client(args, requests, latencies, errors):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    request = json.dumps({'program': PROGRAM}).encode('utf-8') + b'\n'
+    for _ in range(requests):
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if 'error' in response:
+            errors.append(response['error'])
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args):
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    per_client = args.requests // args.concurrency
+    await asyncio.gather(*(client(args, per_client, latencies, errors) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    print('{} requests, {} errors, {} clients in {:.2f}s: {:.0f} req/s'.format(
+        len(latencies), len(errors), args.concurrency, elapsed, len(latencies) / elapsed))
+    print('p50 {:.2f} ms  p99 {:.2f} ms  max {:.2f} ms'.format(
+        quantiles[49] * 1000, quantiles[98] * 1000, latencies[-1] * 1000))
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Measure evaluation server latency')
+    argparser.add_argument('--unix')
+    argparser.add_argument('--host', default='127.0.0.1')
+    argparser.add_argument('--port', type=int, default=8765)
+    argparser.add_argument('--requests', type=int, default=10000)
+    argparser.add_argument('--concurrency', type=int, default=16)
+    asyncio.run(run(argparser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import calc1
+import calc2
+from tokens import Tokens
+from lexer import Lexer
+from scanner import Scanner
+from parser import Parser
+from interpreter import Interpreter
+from resolver import SlotInterpreter
+from optimizer import count_nodes
+from profiler import TokenList
+from generate import ProgramGenerator
+
+
+def drain(lexer):
+    tokens = []
+    token = lexer.get_next_token()
+    while token.type != Tokens.EOF:
+        tokens.append(token)
+        token = lexer.get_next_token()
+    tokens.append(token)
+    return tokens
+
+
+def run_calc1(expressions):
+    for text in expressions:
+        calc1.Interpreter(calc1.Lexer(text)).expr()
+
+
+def run_calc2(expressions):
+    for text in expressions:
+        calc2.Interpreter(calc2.Parser(calc2.Lexer(text))).interpret()
+
+
+def run_calc2_cached(expressions, rounds):
+    # every expression repeats, as in a service re-sending the same formulas
+    cache = calc2.ExpressionCache()
+    for _ in range(rounds):
+        for text in expressions:
+            cache.evaluate(text)
+
+
+def phases(text, expressions):
+    # name -> (function, unit, number of units processed)
+    tokens = drain(Scanner(text))
+    tree = Parser(TokenList(tokens)).parse()
+    return {
+        'lexer': (lambda: drain(Lexer(text)), 'tokens', len(tokens)),
+        'scanner': (lambda: drain(Scanner(text)), 'tokens', len(tokens)),
+        'parser': (lambda: Parser(TokenList(tokens)).parse(), 'nodes', count_nodes(tree)),
+        'interpreter': (lambda: Interpreter(None).visit(tree), 'nodes', count_nodes(tree)),
+        # the engine main.py runs, resolve pass included
+        'slots': (lambda: SlotInterpreter(None).execute(tree), 'nodes', count_nodes(tree)),
+        'calc1': (lambda: run_calc1(expressions), 'expressions', len(expressions)),
+        'calc2': (lambda: run_calc2(expressions), 'expressions', len(expressions)),
+        'calc2_cached': (lambda: run_calc2_cached(expressions, 10), 'expressions', 10 * len(expressions)),
+    }
+
+
+def measure(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    # a separate run, since tracing slows everything down
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+# peak memory below this many bytes of growth is noise, whatever the ratio
+MEMORY_SLACK = 64 * 1024
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results['phases'].items():
+        before = baseline['phases'].get(name)
+        if before is None:
+            continue
+        for key in ('seconds', 'peak_bytes'):
+            limit = before[key] * (1 + threshold)
+            if key == 'peak_bytes':
+                limit = max(limit, before[key] + MEMORY_SLACK)
+            if before[key] and result[key] > limit:
+                regressions.append('{} {}: {:.4g} -> {:.4g} (+{:.0f}%)'.format(
+                    name, key, before[key], result[key], 100 * (result[key] / before[key] - 1)))
+    return regressions
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Benchmark every phase and track regressions')
+    argparser.add_argument('--statements', type=int, default=5000)
+    argparser.add_argument('--depth', type=int, default=4)
+    argparser.add_argument('--variables', type=int, default=100)
+    argparser.add_argument('--nesting', type=int, default=2)
+    argparser.add_argument('--expressions', type=int, default=2000)
+    argparser.add_argument('--seed', type=int, default=0)
+    argparser.add_argument('--repeat', type=int, default=3, help='timed runs per phase; the best counts')
+    argparser.add_argument('--phases', help='comma-separated subset of phases to run')
+    argparser.add_argument('--output', help='write results as JSON to this file')
+    argparser.add_argument('--baseline', help='JSON results to compare against')
+    argparser.add_argument('--threshold', type=float, default=0.10,
+                           help='allowed slowdown or memory growth before failing, as a fraction')
+    args = argparser.parse_args()
+
+    generator = ProgramGenerator(args.statements, args.depth, args.variables, args.nesting, args.seed)
+    text = generator.program()
+    expressions = generator.expressions(args.expressions)
+    selected = phases(text, expressions)
+    if args.phases:
+        selected = {name: selected[name] for name in args.phases.split(',')}
+
+    results = {
+        'python': platform.python_version(),
+        'parameters': {key: getattr(args, key) for key in
+                       ('statements', 'depth', 'variables', 'nesting', 'expressions', 'seed')},
+        'phases': {},
+    }
+    print('{:<12} {:>10} {:>16} {:>12}'.format('phase', 'seconds', 'throughput', 'peak MB'))
+    for name, (function, unit, count) in selected.items():
+        seconds, peak = measure(function, args.repeat)
+        results['phases'][name] = {
+            'seconds': seconds,
+            'unit': unit,
+            'count': count,
+            'throughput': count / seconds,
+            'peak_bytes': peak,
+        }
+        print('{:<12} {:>10.4f} {:>9.0f} {:<6} {:>12.2f}'.format(name, seconds, count / seconds, unit + '/s', peak / 1e6))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('parameters') != results['parameters']:
+            print('warning: baseline was recorded with different parameters', file=sys.stderr)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print('REGRESSION ' + regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
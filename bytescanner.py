@@ -0,0 +1,122 @@
+import re
+from tokens import Token, Tokens, FIXED_TOKENS, EOF_TOKEN
+from lexer import RESERVED_KEYWORDS
+from stream import map_file
+
+
+# Every keyword and fixed lexeme gets its own group, so match.lastindex
+# alone gives the kind and nothing is sliced out of the source to find it.
+# Bytes patterns only know ASCII, so every non-ASCII byte counts as a
+# letter; a UTF-8 identifier is still one ID token.
+LETTER = rb'A-Za-z\x80-\xff'
+
+# group 1 is the skipped whitespace, see scanner.SKIP
+GROUP_KINDS = [None, None]
+GROUP_TOKENS = [None, None]
+alternatives = []
+
+
+def add_group(pattern, kind, token=None):
+    alternatives.append(b'(' + pattern + b')')
+    GROUP_KINDS.append(kind)
+    GROUP_TOKENS.append(token)
+
+
+add_group(rb'\d+\.\d+', Tokens.REAL_CONST)
+add_group(rb'\d+', Tokens.INTEGER)
+for lexeme, token in RESERVED_KEYWORDS.items():
+    add_group(re.escape(lexeme.encode()) + rb'(?![' + LETTER + rb'0-9])', token.type, token)
+add_group(rb'[' + LETTER + rb'][' + LETTER + rb'0-9]*', Tokens.ID)
+for lexeme in sorted(FIXED_TOKENS, key=len, reverse=True):
+    add_group(re.escape(lexeme.encode()), FIXED_TOKENS[lexeme].type, FIXED_TOKENS[lexeme])
+
+BYTES_SKIP = rb'(?=(?P<skip>(?:\s|\{[^}]*\})*))(?P=skip)'
+BYTES_TOKEN_PATTERN = re.compile(BYTES_SKIP + rb'(?:' + b'|'.join(alternatives) + rb')')
+BYTES_WHITESPACE_PATTERN = re.compile(BYTES_SKIP)
+del alternatives
+
+
+class LazyToken(Token):
+    # An ID or number that only remembers where it is in the source. It is
+    # decoded on the first read of .value, and Num and Var nodes built from
+    # it wait for their own first read too.
+    __slots__ = ('data', 'start', 'end', 'decoded')
+
+    deferred = True
+
+    def __init__(self, type, data, start, end):
+        self.type = type
+        self.data = data
+        self.start = start
+        self.end = end
+        self.decoded = None
+
+    @property
+    def value(self):
+        if self.decoded is None:
+            # bytes() of a bytes object is the object itself, not a copy
+            raw = bytes(self.data[self.start:self.end])
+            if self.type == Tokens.INTEGER:
+                self.decoded = int(raw)
+            elif self.type == Tokens.REAL_CONST:
+                self.decoded = float(raw)
+            else:
+                self.decoded = raw.decode('utf-8')
+        return self.decoded
+
+
+class ByteScanner:
+    """Scanner over the UTF-8 source as bytes, a memoryview or an mmap,
+    without ever holding a decoded copy of it."""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self._match = BYTES_TOKEN_PATTERN.match
+
+    def error(self):
+        raise Exception('Error parsing input')
+
+    def finish(self, pos):
+        pos = BYTES_WHITESPACE_PATTERN.match(self.data, pos).end()
+        if pos < len(self.data):
+            self.error()
+        return pos
+
+    def get_next_token(self):
+        match = self._match(self.data, self.pos)
+        if match is None:
+            self.pos = self.finish(self.pos)
+            return EOF_TOKEN
+        group = match.lastindex
+        start, self.pos = match.span(group)
+        token = GROUP_TOKENS[group]
+        if token is not None:
+            return token
+        return LazyToken(GROUP_KINDS[group], self.data, start, self.pos)
+
+    def spans(self):
+        # (kind, start, end) for every token, EOF last; no token objects
+        kinds = GROUP_KINDS
+        match = BYTES_TOKEN_PATTERN.scanner(self.data, self.pos).match
+        pos = self.pos
+        while True:
+            m = match()
+            if m is None:
+                break
+            group = m.lastindex
+            start, pos = m.span(group)
+            yield kinds[group], start, pos
+        self.pos = self.finish(pos)
+        yield Tokens.EOF, self.pos, self.pos
+
+    def tokens(self):
+        while True:
+            token = self.get_next_token()
+            yield token
+            if token.type == Tokens.EOF:
+                return
+
+
+def open_mapped(path):
+    return ByteScanner(map_file(path))
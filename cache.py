@@ -0,0 +1,296 @@
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+from tokens import Token, Tokens, FIXED_TOKENS
+from nodes import Num, UnaryOp, BinOp, Compound, Var, Assign, NoOp, Program, Block, VarDecl, Type, Param, ProcedureDecl, Call
+from lexer import RESERVED_KEYWORDS
+from vm import Code, BytecodeCompiler
+
+
+CACHE_VERSION = 3
+DEFAULT_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'spi')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Entries are only valid for the same cache format and marshal version,
+# just like .pyc files.
+HEADER = importlib.util.MAGIC_NUMBER + CACHE_VERSION.to_bytes(4, 'little')
+# parse trees, and bytecode compiled from them; the opcodes in vm.py are
+# part of the format, so changing them means bumping CACHE_VERSION too
+TREE_SUFFIX = '.spic'
+CODE_SUFFIX = '.spvm'
+
+NUM = 0
+VAR = 1
+BINOP = 2
+UNARYOP = 3
+ASSIGN = 4
+COMPOUND = 5
+NOOP = 6
+PROGRAM = 7
+BLOCK = 8
+VARDECL = 9
+TYPE = 10
+PARAM = 11
+PROCEDURE = 12
+CALL = 13
+
+# operator lexeme -> shared token
+OPERATORS = dict(FIXED_TOKENS)
+OPERATORS['DIV'] = RESERVED_KEYWORDS['DIV']
+
+
+def encode(tree):
+    # Flat postfix form: children come before their parent, so decoding
+    # needs no recursion and marshal never sees nested containers.
+    code = []
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, Num):
+            code.extend((NUM, node.value))
+        elif isinstance(node, Var):
+            code.extend((VAR, node.value))
+        elif isinstance(node, NoOp):
+            code.append(NOOP)
+        elif isinstance(node, Type):
+            code.extend((TYPE, node.value))
+        elif expanded:
+            if isinstance(node, BinOp):
+                code.extend((BINOP, node.op.value))
+            elif isinstance(node, UnaryOp):
+                code.extend((UNARYOP, node.op.value))
+            elif isinstance(node, Assign):
+                code.append(ASSIGN)
+            elif isinstance(node, Program):
+                code.extend((PROGRAM, node.name))
+            elif isinstance(node, Block):
+                code.extend((BLOCK, len(node.declarations)))
+            elif isinstance(node, VarDecl):
+                code.append(VARDECL)
+            elif isinstance(node, Param):
+                code.append(PARAM)
+            elif isinstance(node, ProcedureDecl):
+                code.extend((PROCEDURE, node.name, len(node.params), node.result_type is not None))
+            elif isinstance(node, Call):
+                code.extend((CALL, node.name, len(node.args)))
+            else:
+                code.extend((COMPOUND, len(node.children)))
+        else:
+            stack.append((node, True))
+            if isinstance(node, BinOp):
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, UnaryOp):
+                stack.append((node.expr, False))
+            elif isinstance(node, Assign):
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+            elif isinstance(node, Program):
+                stack.append((node.block, False))
+            elif isinstance(node, Block):
+                stack.append((node.compound_statement, False))
+                stack.extend((declaration, False) for declaration in reversed(node.declarations))
+            elif isinstance(node, (VarDecl, Param)):
+                stack.append((node.type_node, False))
+                stack.append((node.var_node, False))
+            elif isinstance(node, ProcedureDecl):
+                stack.append((node.block, False))
+                if node.result_type is not None:
+                    stack.append((node.result_type, False))
+                stack.extend((param, False) for param in reversed(node.params))
+            elif isinstance(node, Call):
+                stack.extend((arg, False) for arg in reversed(node.args))
+            else:
+                stack.extend((child, False) for child in reversed(node.children))
+    return marshal.dumps(code)
+
+
+def decode(data):
+    code = marshal.loads(data)
+    stack = []
+    i = 0
+    end = len(code)
+    while i < end:
+        tag = code[i]
+        if tag == NUM:
+            value = code[i + 1]
+            kind = Tokens.REAL_CONST if isinstance(value, float) else Tokens.INTEGER
+            stack.append(Num(Token(kind, value)))
+            i += 2
+        elif tag == VAR:
+            stack.append(Var(Token(Tokens.ID, code[i + 1])))
+            i += 2
+        elif tag == BINOP:
+            right = stack.pop()
+            stack[-1] = BinOp(stack[-1], OPERATORS[code[i + 1]], right)
+            i += 2
+        elif tag == UNARYOP:
+            stack[-1] = UnaryOp(OPERATORS[code[i + 1]], stack[-1])
+            i += 2
+        elif tag == ASSIGN:
+            right = stack.pop()
+            stack[-1] = Assign(stack[-1], FIXED_TOKENS[':='], right)
+            i += 1
+        elif tag == COMPOUND:
+            count = code[i + 1]
+            node = Compound()
+            if count:
+                node.children = stack[-count:]
+                del stack[-count:]
+            stack.append(node)
+            i += 2
+        elif tag == NOOP:
+            stack.append(NoOp())
+            i += 1
+        elif tag == TYPE:
+            stack.append(Type(RESERVED_KEYWORDS[code[i + 1]]))
+            i += 2
+        elif tag == VARDECL:
+            type_node = stack.pop()
+            stack[-1] = VarDecl(stack[-1], type_node)
+            i += 1
+        elif tag == PARAM:
+            type_node = stack.pop()
+            stack[-1] = Param(stack[-1], type_node)
+            i += 1
+        elif tag == PROCEDURE:
+            name, count, function = code[i + 1:i + 4]
+            block = stack.pop()
+            result_type = stack.pop() if function else None
+            params = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack.append(ProcedureDecl(name, params, block, result_type))
+            i += 4
+        elif tag == CALL:
+            count = code[i + 2]
+            args = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack.append(Call(Token(Tokens.ID, code[i + 1]), args))
+            i += 3
+        elif tag == BLOCK:
+            compound = stack.pop()
+            count = code[i + 1]
+            declarations = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            stack.append(Block(declarations, compound))
+            i += 2
+        elif tag == PROGRAM:
+            stack[-1] = Program(code[i + 1], stack[-1])
+            i += 2
+        else:
+            raise ValueError('unknown cache tag {}'.format(tag))
+    return stack.pop()
+
+
+class ParseCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, text):
+        return hashlib.sha256(HEADER + text.encode('utf-8')).hexdigest()
+
+    def file_key(self, path, chunk_size=1024 * 1024):
+        # Hash the file in chunks so streaming callers never hold it in memory.
+        # Text mode keeps the key identical to key(open(path).read()).
+        digest = hashlib.sha256(HEADER)
+        with open(path, 'r') as f:
+            for chunk in iter(lambda: f.read(chunk_size), ''):
+                digest.update(chunk.encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key, suffix=TREE_SUFFIX):
+        return os.path.join(self.directory, key + suffix)
+
+    def load(self, key):
+        return self.read(self.path(key), decode)
+
+    def store(self, key, tree):
+        self.write(self.path(key), encode(tree))
+
+    def load_code(self, key):
+        return self.read(self.path(key, CODE_SUFFIX), Code.loads)
+
+    def store_code(self, key, code):
+        self.write(self.path(key, CODE_SUFFIX), code.dumps())
+
+    def read(self, path, decoder):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            if not data.startswith(HEADER):
+                raise ValueError('stale cache entry')
+            value = decoder(data[len(HEADER):])
+        except (ValueError, EOFError, TypeError, IndexError, KeyError):
+            self.discard(path)
+            return None
+        # Entries are evicted least recently used first.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def write(self, path, data):
+        # The cache is only an optimization: a directory that cannot be
+        # written never fails a parse that succeeded.
+        tmp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER)
+                f.write(data)
+            os.replace(tmp, path)
+            tmp = None
+            self.evict()
+        except OSError:
+            pass
+        finally:
+            if tmp is not None:
+                self.discard(tmp)
+
+    def discard(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith((TREE_SUFFIX, CODE_SUFFIX)):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # removed by another process meanwhile
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self.discard(path)
+            total -= size
+
+    def parse(self, key, parser_factory):
+        tree = self.load(key)
+        if tree is None:
+            tree = parser_factory().parse()
+            self.store(key, tree)
+        return tree
+
+    def compile(self, key, tree_factory):
+        # bytecode for the tree tree_factory returns; a hit skips parsing
+        # and compiling both
+        code = self.load_code(key)
+        if code is None:
+            code = BytecodeCompiler().compile(tree_factory())
+            self.store_code(key, code)
+        return code
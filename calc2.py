@@ -1,3 +1,7 @@
+import operator
+from collections import OrderedDict
+
+
 class Tokens:
     INTEGER = 'INTEGER'
     PLUS = 'PLUS'
@@ -7,6 +11,7 @@ class Tokens:
     DIV = 'DIV'
     LPAREN = '('
     RPAREN = ')'
+    ID = 'ID'
     OP_LIST = (PLUS, MINUS, MUL, DIV)
 
 class Token:
@@ -47,6 +52,13 @@ class Lexer:
             self.advance()
         return int(result)
 
+    def _id(self):
+        result = ''
+        while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
+            result += self.current_char
+            self.advance()
+        return result
+
     def get_next_token(self):
         while self.current_char is not None:
             if self.current_char.isspace():
@@ -72,6 +84,8 @@ class Lexer:
             if self.current_char == ')':
                 self.advance()
                 return Token(Tokens.RPAREN, ')')
+            if self.current_char.isalpha() or self.current_char == '_':
+                return Token(Tokens.ID, self._id())
             self.error()
         return Token(Tokens.EOF, None)
 
@@ -96,6 +110,11 @@ class Num(AST):
         self.token = token
         self.value = token.value
 
+class Var(AST):
+    def __init__(self, token):
+        self.token = token
+        self.value = token.value
+
 class Parser:
     def __init__(self, lexer):
         self.lexer = lexer
@@ -128,6 +147,10 @@ class Parser:
             node = self.expr()
             self.eat(Tokens.RPAREN)
             return node
+        elif token.type == Tokens.ID:
+            self.eat(Tokens.ID)
+            return Var(token)
+        self.error()
     
     def term(self):
         node = self.factor()
@@ -152,7 +175,10 @@ class Parser:
         return node
 
     def parse(self):
-        return self.expr()
+        node = self.expr()
+        if self.current_token.type != Tokens.EOF:
+            self.error()
+        return node
 
 class NodeVisitor:
     def visit(self, node):
@@ -164,8 +190,9 @@ class NodeVisitor:
         raise Exception('No visit_{} method'.format(type(node).__name__))
 
 class Interpreter(NodeVisitor):
-    def __init__(self, parser):
+    def __init__(self, parser, variables=None):
         self.parser = parser
+        self.variables = variables or {}
 
     def visit_BinOp(self, node):
         if node.op.type == Tokens.PLUS:
@@ -187,10 +214,98 @@ class Interpreter(NodeVisitor):
     def visit_Num(self, node):
         return node.value
 
+    def visit_Var(self, node):
+        if node.value not in self.variables:
+            raise NameError(repr(node.value))
+        return self.variables[node.value]
+
     def interpret(self):
         tree = self.parser.parse()
         return self.visit(tree)
 
+BINARY_OPS = {
+    Tokens.PLUS: operator.add,
+    Tokens.MINUS: operator.sub,
+    Tokens.MUL: operator.mul,
+    Tokens.DIV: operator.truediv,
+}
+UNARY_OPS = {
+    Tokens.PLUS: operator.pos,
+    Tokens.MINUS: operator.neg,
+}
+
+
+def compile_expression(node):
+    """Turn a tree into a function of the variables dict."""
+    if isinstance(node, Num):
+        value = node.value
+        return lambda variables: value
+    if isinstance(node, Var):
+        name = node.value
+        def load(variables):
+            if name not in variables:
+                raise NameError(repr(name))
+            return variables[name]
+        return load
+    if isinstance(node, UnaryOp):
+        op = UNARY_OPS[node.op.type]
+        expr = compile_expression(node.expr)
+        return lambda variables: op(expr(variables))
+    op = BINARY_OPS[node.op.type]
+    left = compile_expression(node.left)
+    right = compile_expression(node.right)
+    return lambda variables: op(left(variables), right(variables))
+
+
+def normalize(text):
+    # only collapses whitespace: dropping it would join '1 2' into '12'
+    return ' '.join(text.split())
+
+
+class ExpressionCache:
+    """Bounded LRU cache from normalized expression text to its compiled
+    evaluator, so repeated expressions skip lexing and parsing."""
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, text):
+        key = normalize(text)
+        function = self.entries.get(key)
+        if function is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return function
+        self.misses += 1
+        # invalid text raises here and is never cached
+        function = compile_expression(Parser(Lexer(key)).parse())
+        self.entries[key] = function
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return function
+
+    def evaluate(self, text, variables=None):
+        return self.get(text)(variables or {})
+
+    def stats(self):
+        return {'size': len(self.entries), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def clear(self):
+        self.entries.clear()
+
+
+DEFAULT_CACHE = ExpressionCache()
+
+
+def evaluate(text, variables=None, cache=DEFAULT_CACHE):
+    return cache.evaluate(text, variables)
+
 def main():
     while 1:
         try:
@@ -199,11 +314,7 @@ def main():
             break
         if not text:
             continue
-        lexer = Lexer(text)
-        parser = Parser(lexer)
-        interpreter = Interpreter(parser)
-        result = interpreter.interpret()
-        print(result)
+        print(evaluate(text))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,302 @@
+from tokens import Tokens
+from nodes import Num, Var, Compound, NoOp, Program, Block
+from interpreter import NodeVisitor, BINARY_OPS, integer_div
+from resolver import Resolver
+from typecheck import TypeChecker, INTEGER, REAL
+
+
+def undefined(name):
+    raise NameError(repr(name))
+
+
+class ClosureCompiler(NodeVisitor):
+    def compile(self, tree):
+        statements = self.statements(tree)
+
+        def run():
+            scope = {}
+            for statement in statements:
+                statement(scope)
+            return scope
+        return run
+
+    def statements(self, node):
+        if isinstance(node, Program):
+            return self.statements(node.block)
+        if isinstance(node, Block):
+            return self.statements(node.compound_statement)
+        if isinstance(node, Compound):
+            result = []
+            for child in node.children:
+                result.extend(self.statements(child))
+            return result
+        if isinstance(node, NoOp):
+            return []
+        return [self.visit(node)]
+
+    def visit_BinOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op.type
+        if op == Tokens.PLUS:
+            return lambda scope: left(scope) + right(scope)
+        elif op == Tokens.MINUS:
+            return lambda scope: left(scope) - right(scope)
+        elif op == Tokens.MUL:
+            return lambda scope: left(scope) * right(scope)
+        elif op == Tokens.DIV:
+            return lambda scope: left(scope) / right(scope)
+        elif op == Tokens.INTEGER_DIV:
+            return lambda scope: integer_div(left(scope), right(scope))
+
+    def visit_UnaryOp(self, node):
+        expr = self.visit(node.expr)
+        op = node.op.type
+        if op == Tokens.PLUS:
+            return lambda scope: +expr(scope)
+        elif op == Tokens.MINUS:
+            return lambda scope: -expr(scope)
+
+    def visit_Num(self, node):
+        value = node.value
+        return lambda scope: value
+
+    def visit_Var(self, node):
+        name = node.value
+
+        def load(scope):
+            value = scope.get(name)
+            if value is None:
+                raise NameError(repr(name))
+            return value
+        return load
+
+    def visit_Assign(self, node):
+        name = node.left.value
+        right = self.visit(node.right)
+
+        def store(scope):
+            scope[name] = right(scope)
+        return store
+
+    def visit_Call(self, node):
+        raise Exception('procedure calls are not supported here')
+
+
+class SourceCompiler(NodeVisitor):
+    BINARY_OPS = {
+        Tokens.PLUS: '+',
+        Tokens.MINUS: '-',
+        Tokens.MUL: '*',
+        Tokens.DIV: '/',
+    }
+    UNARY_OPS = {
+        Tokens.PLUS: '+',
+        Tokens.MINUS: '-',
+    }
+
+    def __init__(self):
+        # Pascal name -> Python local; names are mapped to v0, v1, ... so that
+        # Pascal identifiers never clash with Python keywords.
+        self.locals = {}
+
+    def compile(self, tree):
+        body = []
+        self.emit(tree, body)
+        scope = ', '.join('{!r}: {}'.format(name, local) for name, local in self.locals.items())
+        lines = ['def run():']
+        lines.extend('    ' + line for line in body)
+        lines.append('    return {' + scope + '}')
+        namespace = {'undefined': undefined, 'integer_div': integer_div}
+        exec(compile('\n'.join(lines), '<spi>', 'exec'), namespace)
+        return namespace['run']
+
+    def emit(self, node, body):
+        if isinstance(node, Program):
+            self.emit(node.block, body)
+        elif isinstance(node, Block):
+            self.emit(node.compound_statement, body)
+        elif isinstance(node, Compound):
+            for child in node.children:
+                self.emit(child, body)
+        elif not isinstance(node, NoOp):
+            body.append(self.visit(node))
+
+    def visit_BinOp(self, node):
+        if node.op.type == Tokens.INTEGER_DIV:
+            return 'integer_div({}, {})'.format(self.visit(node.left), self.visit(node.right))
+        return '({} {} {})'.format(
+            self.visit(node.left), self.BINARY_OPS[node.op.type], self.visit(node.right))
+
+    def visit_UnaryOp(self, node):
+        return '({}{})'.format(self.UNARY_OPS[node.op.type], self.visit(node.expr))
+
+    def visit_Num(self, node):
+        return repr(node.value)
+
+    def visit_Var(self, node):
+        local = self.locals.get(node.value)
+        if local is None:
+            # Programs are straight-line, so a read before the first
+            # assignment fails on every run.
+            return 'undefined({!r})'.format(node.value)
+        return local
+
+    def visit_Assign(self, node):
+        right = self.visit(node.right)
+        name = node.left.value
+        if name not in self.locals:
+            self.locals[name] = 'v{}'.format(len(self.locals))
+        return '{} = {}'.format(self.locals[name], right)
+
+    def visit_Call(self, node):
+        raise Exception('procedure calls are not supported here')
+
+
+def compile_tree(tree):
+    try:
+        return SourceCompiler().compile(tree)
+    except (SyntaxError, RecursionError, MemoryError):
+        # CPython limits how deeply generated expressions may nest
+        return ClosureCompiler().compile(tree)
+
+
+class CompiledInterpreter:
+    def __init__(self, parser):
+        self.parser = parser
+        self.program = None
+        self.GLOBAL_SCOPE = {}
+
+    def execute(self, tree):
+        self.program = compile_tree(tree)
+        self.GLOBAL_SCOPE = self.program()
+
+    def interpret(self):
+        if self.program is None:
+            self.execute(self.parser.parse())
+        else:
+            self.GLOBAL_SCOPE = self.program()
+
+
+SHAPE_SOURCE = {
+    'var': 's[{}]',
+    'const': '{}',
+    'expr': '{}(s)',
+}
+OP_SOURCE = {
+    Tokens.PLUS: '{} + {}',
+    Tokens.MINUS: '{} - {}',
+    Tokens.MUL: '{} * {}',
+    Tokens.DIV: '{} / {}',
+    Tokens.INTEGER_DIV: 'integer_div({}, {})',
+}
+
+
+def make_factory(op, left_shape, right_shape):
+    body = OP_SOURCE[op].format(SHAPE_SOURCE[left_shape].format('a'), SHAPE_SOURCE[right_shape].format('b'))
+    return eval('lambda a, b: lambda s: ' + body, {'integer_div': integer_div})
+
+
+# (operator, left shape, right shape) -> factory for a closure that reads
+# slots or constants directly instead of calling a child closure for them
+BINARY_FACTORIES = {
+    (op, left, right): make_factory(op, left, right)
+    for op in OP_SOURCE for left in SHAPE_SOURCE for right in SHAPE_SOURCE
+}
+
+
+class TypedCompiler(ClosureCompiler):
+    # Compiles a type-checked program into closures over a slot list. Types
+    # are fixed at compile time, so INTEGER constants in REAL arithmetic are
+    # converted once and INTEGER values assigned to REAL variables are
+    # converted by the store itself.
+    def __init__(self, types):
+        self.types = types
+
+    def compile(self, tree):
+        names = Resolver().resolve(tree)
+        statements = self.statements(tree)
+
+        def run():
+            slots = [None] * len(names)
+            for statement in statements:
+                statement(slots)
+            return dict(zip(names, slots))
+        return run
+
+    def operand(self, node, result_type):
+        # (shape, payload) of a BinOp operand
+        if isinstance(node, Num):
+            value = node.value
+            if result_type == REAL:
+                value = float(value)
+            return 'const', value
+        if isinstance(node, Var):
+            return 'var', node.slot
+        return 'expr', self.visit(node)
+
+    def visit_BinOp(self, node):
+        result_type = self.types[node]
+        op = node.op.type
+        if op == Tokens.DIV:
+            result_type = None
+        left_shape, left = self.operand(node.left, result_type)
+        right_shape, right = self.operand(node.right, result_type)
+        if left_shape == 'const' and right_shape == 'const':
+            try:
+                value = BINARY_OPS[op](left, right)
+                return lambda s: value
+            except ZeroDivisionError:
+                pass
+        return BINARY_FACTORIES[op, left_shape, right_shape](left, right)
+
+    def visit_UnaryOp(self, node):
+        expr = self.visit(node.expr)
+        if node.op.type == Tokens.PLUS:
+            return expr
+        return lambda s: -expr(s)
+
+    def visit_Num(self, node):
+        value = node.value
+        return lambda s: value
+
+    def visit_Var(self, node):
+        slot = node.slot
+        return lambda s: s[slot]
+
+    def visit_Assign(self, node):
+        slot = node.left.slot
+        right = node.right
+        if isinstance(right, Num):
+            value = right.value
+            if self.types[node] == REAL:
+                value = float(value)
+
+            def store(s):
+                s[slot] = value
+            return store
+        expr = self.visit(right)
+        if self.types[node] == REAL and self.types[right] == INTEGER:
+            def store(s):
+                s[slot] = float(expr(s))
+        else:
+            def store(s):
+                s[slot] = expr(s)
+        return store
+
+
+class TypedInterpreter:
+    def __init__(self, parser):
+        self.parser = parser
+        self.program = None
+        self.GLOBAL_SCOPE = {}
+
+    def execute(self, tree):
+        self.program = TypedCompiler(TypeChecker().check(tree)).compile(tree)
+        self.GLOBAL_SCOPE = self.program()
+
+    def interpret(self):
+        if self.program is None:
+            self.execute(self.parser.parse())
+        else:
+            self.GLOBAL_SCOPE = self.program()
@@ -0,0 +1,197 @@
+from tokens import Tokens
+from nodes import Num, UnaryOp, BinOp, Var, Assign, Compound, Program, Block
+from parser import Parser, TERM_OPS, EXPR_OPS, NUMBER_CONSTS
+from interpreter import Interpreter, BINARY_OPS, UNARY_OPS
+
+
+class NodeFactory:
+    def __init__(self):
+        # structural key -> the one node built for it; children are already
+        # interned, so their identity stands in for their structure
+        self.nodes = {}
+        self.hits = 0
+
+    def intern(self, key, build):
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = build()
+        else:
+            self.hits += 1
+        return node
+
+    def num(self, token):
+        # the type keeps 1 and 1.0 apart
+        return self.intern((Num, token.type, token.value), lambda: Num(token))
+
+    def var(self, token):
+        return self.intern((Var, token.value), lambda: Var(token))
+
+    def binop(self, left, op, right):
+        return self.intern((BinOp, op.type, id(left), id(right)), lambda: BinOp(left, op, right))
+
+    def unaryop(self, op, expr):
+        return self.intern((UnaryOp, op.type, id(expr)), lambda: UnaryOp(op, expr))
+
+
+class HashConsingParser(Parser):
+    """Parser whose expressions form a DAG: structurally identical
+    subtrees are a single shared node.
+
+    A shared node keeps the token, and so the position, of its first
+    occurrence.
+    """
+
+    def __init__(self, lexer, factory=None):
+        self.factory = factory if factory is not None else NodeFactory()
+        super().__init__(lexer)
+
+    def factor(self):
+        token = self.current_token
+        if token.type in EXPR_OPS:
+            self.eat(token.type)
+            return self.factory.unaryop(token, self.factor())
+        elif token.type in NUMBER_CONSTS:
+            self.eat(token.type)
+            return self.factory.num(token)
+        elif token.type == Tokens.LPAREN:
+            self.eat(Tokens.LPAREN)
+            node = self.expr()
+            self.eat(Tokens.RPAREN)
+            return node
+        else:
+            return self.variable()
+
+    def term(self):
+        node = self.factor()
+        while self.current_token.type in TERM_OPS:
+            token = self.current_token
+            self.eat(token.type)
+            node = self.factory.binop(node, token, self.factor())
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.current_token.type in EXPR_OPS:
+            token = self.current_token
+            self.eat(token.type)
+            node = self.factory.binop(node, token, self.term())
+        return node
+
+    def procedure_declaration(self):
+        # CSEInterpreter runs only straight-line programs
+        raise Exception('procedures are not supported here')
+
+    def variable(self):
+        node = self.factory.var(self.current_token)
+        self.eat(Tokens.ID)
+        return node
+
+
+def statements(tree):
+    if isinstance(tree, Program):
+        tree = tree.block
+    if isinstance(tree, Block):
+        tree = tree.compound_statement
+    if isinstance(tree, Compound):
+        for child in tree.children:
+            yield from statements(child)
+    elif isinstance(tree, Assign):
+        yield tree
+
+
+def shared_reads(tree):
+    """Map every operator node reachable through more than one parent to
+    the sorted names of the variables it reads."""
+    parents = {}
+    reads = {}
+    stack = [(assign.right, False) for assign in statements(tree)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            if isinstance(node, Var):
+                reads[node] = frozenset((node.value,))
+            elif isinstance(node, BinOp):
+                reads[node] = reads[node.left] | reads[node.right]
+            elif isinstance(node, UnaryOp):
+                reads[node] = reads[node.expr]
+            else:
+                reads[node] = frozenset()
+            continue
+        if node in parents:
+            parents[node] += 1
+            continue
+        parents[node] = 1
+        # children are summarized before the node itself
+        stack.append((node, True))
+        if isinstance(node, BinOp):
+            stack.append((node.left, False))
+            stack.append((node.right, False))
+        elif isinstance(node, UnaryOp):
+            stack.append((node.expr, False))
+    return {node: tuple(sorted(reads[node])) for node in reads
+            if parents[node] > 1 and isinstance(node, (BinOp, UnaryOp))}
+
+
+class CSEInterpreter(Interpreter):
+    """Tree-walking interpreter for hash-consed trees that evaluates a
+    shared subexpression once per change of the variables it reads.
+
+    Each variable carries a version bumped on assignment; a cached value
+    is reused while the versions of everything it read are unchanged.
+    """
+
+    def __init__(self, parser):
+        super().__init__(parser)
+        self.shared = {}
+        self.versions = {}
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, node, reads, compute):
+        versions = self.versions
+        stamp = tuple([versions.get(name, 0) for name in reads])
+        entry = self.values.get(node)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = compute(node)
+        self.values[node] = (stamp, value)
+        return value
+
+    def evaluate_BinOp(self, node):
+        return BINARY_OPS[node.op.type](self.visit(node.left), self.visit(node.right))
+
+    def evaluate_UnaryOp(self, node):
+        return UNARY_OPS[node.op.type](self.visit(node.expr))
+
+    def visit_BinOp(self, node):
+        reads = self.shared.get(node)
+        if reads is None:
+            return self.evaluate_BinOp(node)
+        return self.cached(node, reads, self.evaluate_BinOp)
+
+    def visit_UnaryOp(self, node):
+        reads = self.shared.get(node)
+        if reads is None:
+            return self.evaluate_UnaryOp(node)
+        return self.cached(node, reads, self.evaluate_UnaryOp)
+
+    def visit_Assign(self, node):
+        var_name = node.left.value
+        self.GLOBAL_SCOPE[var_name] = self.visit(node.right)
+        self.versions[var_name] = self.versions.get(var_name, 0) + 1
+
+    def visit_ProcedureDecl(self, node):
+        raise Exception('procedures are not supported here')
+
+    def visit_Call(self, node):
+        raise Exception('procedure calls are not supported here')
+
+    def execute(self, tree):
+        self.shared = shared_reads(tree)
+        self.visit(tree)
+
+    def interpret(self):
+        self.execute(self.parser.parse())
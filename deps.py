@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from tokens import Tokens
+from nodes import Compound, Assign, Program, Block, Call
+from interpreter import NodeVisitor, Interpreter
+from resolver import Resolver
+from cache import encode, decode
+
+
+class ReadCollector(NodeVisitor):
+    def __init__(self):
+        self.reads = set()
+        self.divides = False
+
+    def visit_BinOp(self, node):
+        if node.op.type == Tokens.DIV or node.op.type == Tokens.INTEGER_DIV:
+            self.divides = True
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node):
+        self.visit(node.expr)
+
+    def visit_Num(self, node):
+        pass
+
+    def visit_Var(self, node):
+        self.reads.add(node.value)
+
+
+def assignments(tree):
+    # nested BEGIN/END blocks only group statements, so they are flattened
+    result = []
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Compound):
+            stack.extend(reversed(node.children))
+        elif isinstance(node, Program):
+            stack.append(node.block)
+        elif isinstance(node, Block):
+            stack.append(node.compound_statement)
+        elif isinstance(node, Assign):
+            result.append(node)
+        elif isinstance(node, Call):
+            raise Exception('procedure calls are not supported here')
+    return result
+
+
+class Schedule:
+    def __init__(self, tree):
+        self.statements = assignments(tree)
+        self.reads = []
+        divides = []
+        for statement in self.statements:
+            collector = ReadCollector()
+            collector.visit(statement.right)
+            self.reads.append(collector.reads)
+            divides.append(collector.divides)
+        self.dead = self.find_dead(divides)
+        self.levels = self.find_levels()
+
+    def target(self, index):
+        return self.statements[index].left.value
+
+    def find_dead(self, divides):
+        # An assignment is dead when its variable is assigned again before
+        # anything reads it. Dead statements that divide still run, so that
+        # a division by zero fails exactly as it would sequentially.
+        dead = set()
+        overwritten = set()
+        for index in range(len(self.statements) - 1, -1, -1):
+            name = self.target(index)
+            if name in overwritten and not divides[index]:
+                dead.add(index)
+                continue
+            overwritten.add(name)
+            overwritten -= self.reads[index]
+        return dead
+
+    def find_levels(self):
+        # A statement goes one level after every earlier statement it
+        # conflicts with: read after write, write after read, write after write.
+        write_level = {}
+        read_level = {}
+        levels = []
+        for index, statement in enumerate(self.statements):
+            if index in self.dead:
+                continue
+            name = self.target(index)
+            level = max(write_level.get(name, -1), read_level.get(name, -1))
+            for read in self.reads[index]:
+                level = max(level, write_level.get(read, -1))
+            level += 1
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(index)
+            write_level[name] = level
+            for read in self.reads[index]:
+                read_level[read] = max(read_level.get(read, -1), level)
+        return levels
+
+
+# The right-hand sides of the scheduled statements, decoded once in each
+# worker process by load_statements.
+worker_statements = None
+
+
+def load_statements(encoded):
+    global worker_statements
+    worker_statements = {index: decode(data) for index, data in encoded.items()}
+
+
+def run_remote_batch(batch):
+    indices, scope = batch
+    interpreter = Interpreter(None)
+    interpreter.GLOBAL_SCOPE = scope
+    return [(index, interpreter.visit(worker_statements[index])) for index in indices]
+
+
+class ParallelInterpreter(Interpreter):
+    # With processes=False batches run on threads, which only overlap on a
+    # free-threaded build. Processes get the statements once, in the
+    # parse cache encoding, and then only the values each batch reads.
+    def __init__(self, parser, workers=4, batch=64, processes=False):
+        super().__init__(parser)
+        self.workers = workers
+        self.batch = batch
+        self.processes = processes
+
+    def run_batch(self, indices):
+        # Reads only see values from earlier levels, so every statement in
+        # a batch can run without seeing the others' writes.
+        return [(index, self.visit(self.schedule.statements[index].right)) for index in indices]
+
+    def remote_batch(self, indices):
+        reads = self.schedule.reads
+        scope = self.GLOBAL_SCOPE
+        return indices, {name: scope.get(name) for index in indices for name in reads[index]}
+
+    def visit_Var(self, node):
+        return self.GLOBAL_SCOPE[node.value]
+
+    def make_executor(self):
+        if not self.processes:
+            return ThreadPoolExecutor(max_workers=self.workers)
+        statements = self.schedule.statements
+        encoded = {index: encode(statements[index].right) for level in self.schedule.levels for index in level}
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=load_statements, initargs=(encoded,))
+
+    def execute(self, tree):
+        names = Resolver().resolve(tree)
+        self.schedule = Schedule(tree)
+        with self.make_executor() as executor:
+            for level in self.schedule.levels:
+                if len(level) <= self.batch:
+                    results = [self.run_batch(level)]
+                else:
+                    batches = [level[i:i + self.batch] for i in range(0, len(level), self.batch)]
+                    if self.processes:
+                        results = list(executor.map(run_remote_batch, map(self.remote_batch, batches)))
+                    else:
+                        results = list(executor.map(self.run_batch, batches))
+                # applied in source order, so the outcome is deterministic
+                for batch in results:
+                    for index, value in batch:
+                        self.GLOBAL_SCOPE[self.schedule.target(index)] = value
+        self.GLOBAL_SCOPE = {name: self.GLOBAL_SCOPE[name] for name in names}
+
+    def interpret(self):
+        self.execute(self.parser.parse())
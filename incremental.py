@@ -0,0 +1,243 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from tokens import Tokens
+from nodes import ProcedureDecl
+from interpreter import Interpreter
+from tokenstream import tokenize, BufferedParser
+
+
+MISSING = object()
+
+
+def same(a, b):
+    # 1 and 1.0 compare equal but print differently
+    return type(a) is type(b) and a == b
+
+
+class Lengths:
+    # Fenwick tree over the lengths of the top-level statement regions, so
+    # that offsets stay O(log n) to update and to look up after an edit.
+    def __init__(self, lengths):
+        self.size = len(lengths)
+        self.tree = [0] * (self.size + 1)
+        for i, length in enumerate(lengths):
+            self.add(i, length)
+
+    def add(self, index, delta):
+        index += 1
+        while index <= self.size:
+            self.tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index):
+        # sum of the first `index` lengths
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, offset):
+        # index of the region containing offset (relative to the first one)
+        index = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = index + step
+            if nxt <= self.size and self.tree[nxt] <= offset:
+                index = nxt
+                offset -= self.tree[nxt]
+            step >>= 1
+        return index
+
+
+class StatementRunner(Interpreter):
+    # Runs one top-level statement, reading outside values through lookup and
+    # recording what the statement reads from before it and what it writes.
+    def __init__(self, lookup):
+        super().__init__(None)
+        self.lookup = lookup
+        self.reads = set()
+        self.writes = {}
+
+    def visit_Assign(self, node):
+        self.writes[node.left.value] = self.visit(node.right)
+
+    def visit_Var(self, node):
+        name = node.value
+        if name in self.writes:
+            return self.writes[name]
+        self.reads.add(name)
+        return self.lookup(name)
+
+    def visit_Call(self, node):
+        raise Exception('procedure calls are not supported here')
+
+
+class IncrementalProgram:
+    def __init__(self, text):
+        self.text = text
+        self.rebuild()
+
+    def rebuild(self):
+        self.broken = True
+        buffer = tokenize(self.text)
+        offsets = buffer.offsets
+        parser = BufferedParser(buffer)
+        if parser.kinds[0] == Tokens.PROGRAM:
+            # declarations do not change how statements run
+            parser.eat(Tokens.PROGRAM)
+            parser.variable()
+            parser.eat(Tokens.SEMI)
+            if any(isinstance(declaration, ProcedureDecl) for declaration in parser.declarations()):
+                raise Exception('procedures are not supported here')
+        parser.eat(Tokens.BEGIN)
+        self.statements = []
+        starts = []
+        # length of each statement's own text, without the separator after it
+        self.bodies = []
+        while True:
+            start = offsets[parser.pos]
+            self.statements.append(parser.statement())
+            starts.append(start)
+            self.bodies.append(offsets[parser.pos] - start)
+            if parser.kinds[parser.pos] != Tokens.SEMI:
+                break
+            parser.eat(Tokens.SEMI)
+        if parser.kinds[parser.pos] == Tokens.ID:
+            parser.error()
+        end = offsets[parser.pos]
+        parser.eat(Tokens.END)
+        parser.eat(Tokens.DOT)
+        if parser.kinds[parser.pos] != Tokens.EOF:
+            parser.error()
+        self.prefix = starts[0]
+        starts.append(end)
+        self.lengths = Lengths([starts[i + 1] - starts[i] for i in range(len(self.statements))])
+
+        self.reads = []
+        self.writes = []
+        self.writers = {}
+        self.readers = {}
+        for index, statement in enumerate(self.statements):
+            runner = self.execute(index, statement)
+            self.reads.append(runner.reads)
+            self.writes.append(runner.writes)
+            for name in runner.reads:
+                self.readers.setdefault(name, []).append(index)
+            for name in runner.writes:
+                self.writers.setdefault(name, []).append(index)
+        self.rebuild_scope()
+        self.broken = False
+        return self.GLOBAL_SCOPE
+
+    def rebuild_scope(self):
+        # in order of first assignment, like Interpreter.GLOBAL_SCOPE
+        names = sorted(self.writers, key=lambda name: self.writers[name][0])
+        self.GLOBAL_SCOPE = {name: self.writes[self.writers[name][-1]][name] for name in names}
+
+    def value_before(self, index, name):
+        writers = self.writers.get(name)
+        if writers:
+            position = bisect_left(writers, index)
+            if position:
+                return self.writes[writers[position - 1]][name]
+        raise NameError(repr(name))
+
+    def execute(self, index, statement):
+        runner = StatementRunner(lambda name: self.value_before(index, name))
+        runner.visit(statement)
+        return runner
+
+    def edit(self, start, end, replacement):
+        self.text = self.text[:start] + replacement + self.text[end:]
+        if self.broken:
+            return self.rebuild()
+        # stays set if anything below raises, so the next edit starts over
+        self.broken = True
+        index = self.lengths.find(start - self.prefix) if start >= self.prefix else -1
+        if not 0 <= index < len(self.statements):
+            return self.rebuild()
+        region = self.prefix + self.lengths.prefix(index)
+        body = self.bodies[index]
+        if end > region + body:
+            # the edit reaches into a separator, so statements may have
+            # merged or split
+            return self.rebuild()
+        new_body = body + len(replacement) - (end - start)
+        parser = BufferedParser(tokenize(self.text[region:region + new_body]))
+        statement = parser.statement()
+        if parser.kinds[parser.pos] != Tokens.EOF:
+            return self.rebuild()
+
+        self.statements[index] = statement
+        self.bodies[index] = new_body
+        self.lengths.add(index, new_body - body)
+        self.update(index)
+        self.broken = False
+        return self.GLOBAL_SCOPE
+
+    def update(self, index):
+        old_reads = self.reads[index]
+        old_writes = self.writes[index]
+        runner = self.execute(index, self.statements[index])
+        for name in old_reads - runner.reads:
+            self.readers[name].remove(index)
+        for name in runner.reads - old_reads:
+            self.readers.setdefault(name, [])
+            self.readers[name].insert(bisect_left(self.readers[name], index), index)
+        names_changed = False
+        for name in old_writes.keys() - runner.writes.keys():
+            self.writers[name].remove(index)
+            if not self.writers[name]:
+                del self.writers[name]
+            names_changed = True
+        for name in runner.writes.keys() - old_writes.keys():
+            self.writers.setdefault(name, [])
+            self.writers[name].insert(bisect_left(self.writers[name], index), index)
+            names_changed = True
+        self.reads[index] = runner.reads
+        self.writes[index] = runner.writes
+
+        changed = [name for name in old_writes.keys() | runner.writes.keys()
+                   if not same(old_writes.get(name, MISSING), runner.writes.get(name, MISSING))]
+        if names_changed:
+            self.propagate(index, changed)
+            self.rebuild_scope()
+        else:
+            self.refresh(index, changed)
+            self.propagate(index, changed)
+
+    def propagate(self, index, changed):
+        # Re-run, in order, only the statements that read a changed value
+        # before it is overwritten again.
+        pending = []
+        queued = set()
+        self.schedule(index, changed, pending, queued)
+        while pending:
+            index = heapq.heappop(pending)
+            queued.discard(index)
+            old_writes = self.writes[index]
+            runner = self.execute(index, self.statements[index])
+            self.writes[index] = runner.writes
+            changed = [name for name, value in runner.writes.items() if not same(old_writes[name], value)]
+            self.refresh(index, changed)
+            self.schedule(index, changed, pending, queued)
+
+    def schedule(self, index, names, pending, queued):
+        for name in names:
+            readers = self.readers.get(name)
+            if not readers:
+                continue
+            writers = self.writers.get(name, [])
+            position = bisect_right(writers, index)
+            last = writers[position] if position < len(writers) else len(self.statements)
+            for reader in readers[bisect_right(readers, index):bisect_right(readers, last)]:
+                if reader not in queued:
+                    queued.add(reader)
+                    heapq.heappush(pending, reader)
+
+    def refresh(self, index, names):
+        for name in names:
+            writers = self.writers.get(name)
+            if writers and writers[-1] == index:
+                self.GLOBAL_SCOPE[name] = self.writes[index][name]
@@ -1,6 +1,26 @@
+import operator
 from tokens import Token, Tokens
 
 
+def integer_div(left, right):
+    # Pascal DIV truncates toward zero, Python's // floors
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+BINARY_OPS = {
+    Tokens.PLUS: operator.add,
+    Tokens.MINUS: operator.sub,
+    Tokens.MUL: operator.mul,
+    Tokens.DIV: operator.truediv,
+    Tokens.INTEGER_DIV: integer_div,
+}
+UNARY_OPS = {
+    Tokens.PLUS: operator.pos,
+    Tokens.MINUS: operator.neg,
+}
+
+
 class NodeVisitor:
     def visit(self, node):
         method_name = 'visit_' + type(node).__name__
@@ -11,32 +31,33 @@ class NodeVisitor:
         raise Exception('No visit_{} method'.format(type(node).__name__))
 
 class Interpreter(NodeVisitor):
-
-    GLOBAL_SCOPE = {}
-    
     def __init__(self, parser):
         self.parser = parser
+        self.GLOBAL_SCOPE = {}
 
     def visit_BinOp(self, node):
-        if node.op.type == Tokens.PLUS:
-            return self.visit(node.left) + self.visit(node.right)
-        elif node.op.type == Tokens.MINUS:
-            return self.visit(node.left) - self.visit(node.right)
-        elif node.op.type == Tokens.MUL:
-            return self.visit(node.left) * self.visit(node.right)
-        elif node.op.type == Tokens.DIV:
-            return self.visit(node.left) / self.visit(node.right)
+        return BINARY_OPS[node.op.type](self.visit(node.left), self.visit(node.right))
 
     def visit_UnaryOp(self, node):
-        op = node.op.type
-        if op == Tokens.PLUS:
-            return +self.visit(node.expr)
-        elif op == Tokens.MINUS:
-            return - self.visit(node.expr)
+        return UNARY_OPS[node.op.type](self.visit(node.expr))
     
     def visit_Num(self, node):
         return node.value
 
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        for declaration in node.declarations:
+            self.visit(declaration)
+        self.visit(node.compound_statement)
+
+    def visit_VarDecl(self, node):
+        pass
+
+    def visit_Type(self, node):
+        pass
+
     def visit_Compound(self, node):
         for child in node.children:
             self.visit(child)
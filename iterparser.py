@@ -0,0 +1,151 @@
+from tokens import Tokens
+from nodes import Num, UnaryOp, BinOp, Compound, Var, Assign, NoOp, Program, Block
+from parser import Parser, NUMBER_CONSTS
+from interpreter import Interpreter, BINARY_OPS, UNARY_OPS
+
+
+PRECEDENCE = {
+    Tokens.PLUS: 1,
+    Tokens.MINUS: 1,
+    Tokens.MUL: 2,
+    Tokens.DIV: 2,
+    Tokens.INTEGER_DIV: 2,
+}
+
+# kinds of operator stack entries
+BINARY = 0
+UNARY = 1
+PAREN = 2
+
+
+class IterativeParser(Parser):
+    # Same grammar and AST as Parser, but driven by explicit stacks instead
+    # of one Python frame per nesting level.
+
+    def expr(self):
+        operands = []
+        operators = []
+        parens = 0
+        while True:
+            # operand position: prefix operators, '(' or a leaf
+            token = self.current_token
+            if token.type == Tokens.PLUS or token.type == Tokens.MINUS:
+                self.eat(token.type)
+                operators.append((UNARY, token))
+                continue
+            if token.type == Tokens.LPAREN:
+                self.eat(Tokens.LPAREN)
+                operators.append((PAREN, token))
+                parens += 1
+                continue
+            if token.type in NUMBER_CONSTS:
+                self.eat(token.type)
+                operands.append(Num(token))
+            else:
+                operands.append(self.variable())
+
+            # operator position: close parentheses, then a binary operator
+            while True:
+                while operators and operators[-1][0] == UNARY:
+                    operands[-1] = UnaryOp(operators.pop()[1], operands[-1])
+                if self.current_token.type != Tokens.RPAREN or not parens:
+                    break
+                self.reduce(operands, operators, 0)
+                operators.pop()
+                parens -= 1
+                self.eat(Tokens.RPAREN)
+            token = self.current_token
+            precedence = PRECEDENCE.get(token.type)
+            if precedence is None:
+                break
+            self.reduce(operands, operators, precedence)
+            self.eat(token.type)
+            operators.append((BINARY, token))
+
+        self.reduce(operands, operators, 0)
+        if operators:
+            # an unclosed '('
+            self.eat(Tokens.RPAREN)
+        return operands.pop()
+
+    def reduce(self, operands, operators, precedence):
+        while operators and operators[-1][0] == BINARY and PRECEDENCE[operators[-1][1].type] >= precedence:
+            right = operands.pop()
+            operands[-1] = BinOp(operands[-1], operators.pop()[1], right)
+
+    def compound_statement(self):
+        self.eat(Tokens.BEGIN)
+        blocks = [Compound()]
+        while True:
+            if self.current_token.type == Tokens.BEGIN:
+                self.eat(Tokens.BEGIN)
+                blocks.append(Compound())
+                continue
+            if self.current_token.type == Tokens.ID:
+                blocks[-1].children.append(self.assignment_statement())
+            else:
+                blocks[-1].children.append(self.empty())
+            while True:
+                if self.current_token.type == Tokens.SEMI:
+                    self.eat(Tokens.SEMI)
+                    break
+                if self.current_token.type == Tokens.ID:
+                    self.error()
+                self.eat(Tokens.END)
+                block = blocks.pop()
+                if not blocks:
+                    return block
+                blocks[-1].children.append(block)
+
+    def factor(self):
+        return self.expr()
+
+    def term(self):
+        return self.expr()
+
+
+class IterativeInterpreter(Interpreter):
+    def visit(self, tree):
+        scope = self.GLOBAL_SCOPE
+        values = []
+        # nodes still to evaluate, plus (function, arity) and assignment
+        # targets (str) that consume what their operands left in values
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            kind = type(node)
+            if kind is Num:
+                values.append(node.value)
+            elif kind is Var:
+                value = scope.get(node.value)
+                if value is None:
+                    raise NameError(repr(node.value))
+                values.append(value)
+            elif kind is BinOp:
+                stack.append((BINARY_OPS[node.op.type], 2))
+                stack.append(node.right)
+                stack.append(node.left)
+            elif kind is UnaryOp:
+                stack.append((UNARY_OPS[node.op.type], 1))
+                stack.append(node.expr)
+            elif kind is tuple:
+                function, arity = node
+                if arity == 2:
+                    right = values.pop()
+                    values[-1] = function(values[-1], right)
+                else:
+                    values[-1] = function(values[-1])
+            elif kind is str:
+                scope[node] = values.pop()
+            elif kind is Assign:
+                stack.append(node.left.value)
+                stack.append(node.right)
+            elif kind is Compound:
+                stack.extend(reversed(node.children))
+            elif kind is Program:
+                stack.append(node.block)
+            elif kind is Block:
+                stack.append(node.compound_statement)
+            elif kind is not NoOp:
+                self.generic_visit(node)
+        return values.pop() if values else None
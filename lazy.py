@@ -0,0 +1,103 @@
+from array import array
+from bisect import bisect_left
+from interpreter import Interpreter
+from deps import ReadCollector, assignments
+
+
+class Definition:
+    __slots__ = ('index', 'assign', 'reads', 'value', 'forced')
+
+    def __init__(self, index, assign):
+        self.index = index
+        self.assign = assign
+        self.reads = None
+        self.value = None
+        self.forced = False
+
+
+class LazyInterpreter(Interpreter):
+    """Computes only the requested variables.
+
+    Every assignment becomes a memoized thunk, and a read inside it is
+    bound to the last definition of that variable before it. Forcing the
+    final definitions of the requested names evaluates just the
+    assignments they transitively depend on, so errors such as a division
+    by zero in an assignment nobody needs are never raised.
+    """
+
+    def __init__(self, parser, names):
+        super().__init__(parser)
+        self.names = names
+        self.statements = []
+        # variable name -> indices of the statements assigning it, in order
+        self.indices = {}
+        # statement index -> thunk, made only once something needs it
+        self.definitions = {}
+        self.env = None
+        self.forced = 0
+
+    def reaching(self, name, index):
+        indices = self.indices.get(name)
+        if indices is None:
+            return None
+        position = bisect_left(indices, index)
+        if not position:
+            return None
+        index = indices[position - 1]
+        definition = self.definitions.get(index)
+        if definition is None:
+            definition = self.definitions[index] = Definition(index, self.statements[index])
+        return definition
+
+    def dependencies(self, definition):
+        if definition.reads is None:
+            collector = ReadCollector()
+            collector.visit(definition.assign.right)
+            definition.reads = {}
+            for name in collector.reads:
+                reaching = self.reaching(name, definition.index)
+                if reaching is None:
+                    raise NameError(repr(name))
+                definition.reads[name] = reaching
+        return definition.reads
+
+    def force(self, definition):
+        # an explicit stack, since chains like a := a + 1 run thousands deep
+        stack = [definition]
+        while stack:
+            top = stack[-1]
+            if top.forced:
+                stack.pop()
+                continue
+            pending = [read for read in self.dependencies(top).values() if not read.forced]
+            if pending:
+                stack.extend(pending)
+                continue
+            self.env = {name: read.value for name, read in top.reads.items()}
+            top.value = self.visit(top.assign.right)
+            top.forced = True
+            self.forced += 1
+            # the value is all later reads need
+            top.assign = None
+            stack.pop()
+        return definition.value
+
+    def visit_Var(self, node):
+        return self.env[node.value]
+
+    def execute(self, tree):
+        self.statements = assignments(tree)
+        for index, assign in enumerate(self.statements):
+            name = assign.left.value
+            indices = self.indices.get(name)
+            if indices is None:
+                indices = self.indices[name] = array('i')
+            indices.append(index)
+        for name in self.names:
+            final = self.reaching(name, len(self.statements))
+            if final is None:
+                raise NameError(repr(name))
+            self.GLOBAL_SCOPE[name] = self.force(final)
+
+    def interpret(self):
+        self.execute(self.parser.parse())
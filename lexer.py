@@ -1,9 +1,16 @@
-from tokens import Token, Tokens
+from tokens import Token, Tokens, FixedToken, FIXED_TOKENS, EOF_TOKEN
 
 
 RESERVED_KEYWORDS = {
-    'BEGIN': Token('BEGIN', 'BEGIN'),
-    'END': Token('END', 'END'),
+    'PROGRAM': FixedToken(Tokens.PROGRAM, 'PROGRAM'),
+    'VAR': FixedToken(Tokens.VAR, 'VAR'),
+    'PROCEDURE': FixedToken(Tokens.PROCEDURE, 'PROCEDURE'),
+    'FUNCTION': FixedToken(Tokens.FUNCTION, 'FUNCTION'),
+    'DIV': FixedToken(Tokens.INTEGER_DIV, 'DIV'),
+    'INTEGER': FixedToken(Tokens.INTEGER_TYPE, 'INTEGER'),
+    'REAL': FixedToken(Tokens.REAL_TYPE, 'REAL'),
+    'BEGIN': FixedToken(Tokens.BEGIN, 'BEGIN'),
+    'END': FixedToken(Tokens.END, 'END'),
 }
 
 class Lexer:
@@ -26,6 +33,13 @@ class Lexer:
         while self.current_char is not None and self.current_char.isspace():
             self.advance()
 
+    def skip_comment(self):
+        while self.current_char != '}':
+            if self.current_char is None:
+                self.error()
+            self.advance()
+        self.advance()
+
     def peek(self):
         peek_pos = self.pos + 1
         if peek_pos > len(self.text) - 1:
@@ -38,52 +52,69 @@ class Lexer:
         while self.current_char is not None and self.current_char.isalnum():
             result += self.current_char
             self.advance()
-        token = RESERVED_KEYWORDS.get(result, Token(Tokens.ID, result))
+        token = RESERVED_KEYWORDS.get(result) or Token(Tokens.ID, result)
         return token
     
-    def integer(self):
+    def number(self):
         result = ''
         while self.current_char is not None and self.current_char.isdigit():
             result += self.current_char
             self.advance()
-        return int(result)
+        if self.current_char == '.' and self.peek() is not None and self.peek().isdigit():
+            result += self.current_char
+            self.advance()
+            while self.current_char is not None and self.current_char.isdigit():
+                result += self.current_char
+                self.advance()
+            return Token(Tokens.REAL_CONST, float(result))
+        return Token(Tokens.INTEGER, int(result))
 
     def get_next_token(self):
         while self.current_char is not None:
             if self.current_char.isspace():
                 self.skip_whitespace()
                 continue
+            if self.current_char == '{':
+                self.advance()
+                self.skip_comment()
+                continue
             if self.current_char.isdigit():
-                return Token(Tokens.INTEGER, self.integer())
+                return self.number()
             if self.current_char == '+':
                 self.advance()
-                return Token(Tokens.PLUS, '+')
+                return FIXED_TOKENS['+']
             if self.current_char == '-':
                 self.advance()
-                return Token(Tokens.MINUS, '-')
+                return FIXED_TOKENS['-']
             if self.current_char == '*':
                 self.advance()
-                return Token(Tokens.MUL, '*')
+                return FIXED_TOKENS['*']
             if self.current_char == '/':
                 self.advance()
-                return Token(Tokens.DIV, '/')
+                return FIXED_TOKENS['/']
             if self.current_char == '(':
                 self.advance()
-                return Token(Tokens.LPAREN, '(')
+                return FIXED_TOKENS['(']
             if self.current_char == ')':
                 self.advance()
-                return Token(Tokens.RPAREN, ')')
+                return FIXED_TOKENS[')']
             if self.current_char.isalpha():
                 return self._id()
             if self.current_char == ':' and self.peek() == '=':
                 self.advance()
                 self.advance()
-                return Token(Tokens.ASSIGN, ':=')
+                return FIXED_TOKENS[':=']
+            if self.current_char == ':':
+                self.advance()
+                return FIXED_TOKENS[':']
+            if self.current_char == ',':
+                self.advance()
+                return FIXED_TOKENS[',']
             if self.current_char == ';':
                 self.advance()
-                return Token(Tokens.SEMI, ';');
+                return FIXED_TOKENS[';']
             if self.current_char == '.':
                 self.advance()
-                return Token(Tokens.DOT, '.')
+                return FIXED_TOKENS['.']
             self.error()
-        return Token(Tokens.EOF, None)
\ No newline at end of file
+        return EOF_TOKEN
\ No newline at end of file
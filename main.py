@@ -1,16 +1,138 @@
+import argparse
 import sys
-from lexer import Lexer
+from scanner import Scanner
+from stream import open_stream
+from bytescanner import open_mapped
+from tokenstream import BufferedParser
+from parscan import tokenize_file
 from parser import Parser
-from interpreter import Interpreter
+from resolver import SlotInterpreter, MAX_CALL_DEPTH
+from optimizer import Optimizer
+from cache import ParseCache, DEFAULT_DIRECTORY
+from profiler import Profile
+from compiler import CompiledInterpreter, TypedInterpreter
+from typecheck import TypeChecker
+from cse import HashConsingParser, CSEInterpreter
+from lazy import LazyInterpreter
+from deps import ParallelInterpreter
+from vm import VMInterpreter
 
 
 def main():
-    text = open(sys.argv[1], 'r').read()
-    
-    lexer = Lexer(text)
-    parser = Parser(lexer)
-    interpreter = Interpreter(parser)
-    result = interpreter.interpret()
+    argparser = argparse.ArgumentParser(description='Simple Pascal interpreter')
+    argparser.add_argument('file')
+    # one way of lexing, and one engine, per run
+    lexers = argparser.add_mutually_exclusive_group()
+    lexers.add_argument('--stream', action='store_true',
+                        help='lex the file lazily in chunks through mmap')
+    lexers.add_argument('--bytes', action='store_true',
+                        help='lex the mapped file as bytes, decoding only the values that are read')
+    lexers.add_argument('--jobs', type=int,
+                        help='lex the file on this many processes before parsing')
+    argparser.add_argument('-O', '--optimize', action='store_true',
+                           help='fold constants before interpreting')
+    argparser.add_argument('--no-cache', action='store_true',
+                           help='always re-lex and re-parse the file')
+    argparser.add_argument('--cache-dir', default=DEFAULT_DIRECTORY,
+                           help='where parsed programs are cached')
+    # engines other than --cse's keep per-node state, which a shared
+    # subtree would mix up
+    engines = argparser.add_mutually_exclusive_group()
+    engines.add_argument('--typed', action='store_true',
+                         help='type-check against the VAR declarations and run type-specialized code')
+    engines.add_argument('--compiled', action='store_true',
+                         help='compile the program to a Python function and run that; slower than interpreting for one run')
+    engines.add_argument('--vm', action='store_true',
+                         help='compile the program to bytecode, cached with the parse, and run it on a stack VM')
+    engines.add_argument('--cse', action='store_true',
+                         help='share identical subexpressions and evaluate each once per change of its inputs')
+    argparser.add_argument('--max-call-depth', type=int, default=MAX_CALL_DEPTH,
+                           help='deepest PROCEDURE/FUNCTION nesting allowed at run time')
+    engines.add_argument('--vars',
+                         help='comma-separated variables to compute; only the assignments they need run')
+    engines.add_argument('--parallel', type=int, metavar='WORKERS',
+                         help='skip dead assignments and run independent ones on this many processes')
+    argparser.add_argument('--threads', action='store_true',
+                           help='with --parallel, use threads instead of processes')
+    argparser.add_argument('--profile', action='store_true',
+                           help='report time per phase, node type and source line')
+    argparser.add_argument('--profile-output', default='spi.folded',
+                           help='collapsed stack file for flamegraph tools')
+    args = argparser.parse_args()
+    # hash-consing happens in the parser, which --jobs replaces
+    if args.cse and args.jobs:
+        argparser.error('argument --cse: not allowed with argument --jobs')
+    if args.threads and not args.parallel:
+        argparser.error('argument --threads: only allowed with argument --parallel')
+
+    if args.profile:
+        profile = Profile()
+        scope = profile.run(open(args.file, 'r').read(), args.optimize)
+        print(profile.report(), file=sys.stderr)
+        profile.write_folded(args.profile_output)
+        print(scope)
+        return
+
+    def make_parser():
+        if args.jobs:
+            return BufferedParser(tokenize_file(args.file, args.jobs))
+        if args.stream:
+            lexer = open_stream(args.file)
+        elif args.bytes:
+            lexer = open_mapped(args.file)
+        else:
+            text = open(args.file, 'r').read()
+            lexer = Scanner(text)
+        if args.cse:
+            return HashConsingParser(lexer)
+        return Parser(lexer)
+
+    # the cache stores trees, which would undo the sharing
+    caching = not (args.no_cache or args.cse)
+    if caching:
+        cache = ParseCache(args.cache_dir)
+        key = cache.file_key(args.file)
+
+    def make_tree():
+        if caching:
+            tree = cache.parse(key, make_parser)
+        else:
+            tree = make_parser().parse()
+        declared = None
+        if args.typed:
+            # checked before -O, whose propagated constants lose the VAR types
+            checker = TypeChecker()
+            checker.check(tree)
+            declared = checker.declared
+        if args.optimize:
+            optimizer = Optimizer(declared)
+            tree = optimizer.optimize(tree)
+            print('optimizer removed {} nodes'.format(optimizer.removed), file=sys.stderr)
+        return tree
+
+    if args.vm and caching:
+        # bytecode is cached apart from the tree, once per -O setting; a
+        # hit skips parsing and compiling both
+        interpreter = VMInterpreter(None)
+        interpreter.run(cache.compile(key + '-O' if args.optimize else key, make_tree))
+        print(interpreter.GLOBAL_SCOPE)
+        return
+    tree = make_tree()
+    if args.vars:
+        interpreter = LazyInterpreter(None, args.vars.split(','))
+    elif args.parallel:
+        interpreter = ParallelInterpreter(None, args.parallel, processes=not args.threads)
+    elif args.typed:
+        interpreter = TypedInterpreter(None)
+    elif args.cse:
+        interpreter = CSEInterpreter(None)
+    elif args.compiled:
+        interpreter = CompiledInterpreter(None)
+    elif args.vm:
+        interpreter = VMInterpreter(None)
+    else:
+        interpreter = SlotInterpreter(None, args.max_call_depth)
+    interpreter.execute(tree)
     print(interpreter.GLOBAL_SCOPE)
 
 if __name__ == '__main__':
@@ -1,41 +1,149 @@
 
 
 class AST:
-    pass
+    __slots__ = ()
+
+    @property
+    def lineno(self):
+        token = getattr(self, 'token', None)
+        return token.lineno if token is not None else None
+
+    @property
+    def column(self):
+        token = getattr(self, 'token', None)
+        return token.column if token is not None else None
+
+def load_value(node, name):
+    # __getattr__ of nodes that leave value unset for a deferred token:
+    # decoded on first read, then stored in the slot like any other
+    if name != 'value':
+        raise AttributeError(name)
+    node.value = value = node.token.value
+    return value
 
 class BinOp(AST):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
         self.right = right
-        self.token = op
+
+    @property
+    def token(self):
+        return self.op
 
 class UnaryOp(AST):
+    __slots__ = ('op', 'expr')
+
     def __init__(self, op, expr):
-        self.token = op
         self.op = op
         self.expr = expr
 
+    @property
+    def token(self):
+        return self.op
+
 class Num(AST):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token):
         self.token = token
-        self.value = token.value
+        if not token.deferred:
+            self.value = token.value
+
+    __getattr__ = load_value
 
 class Compound(AST):
+    __slots__ = ('children',)
+
     def __init__(self):
         self.children = []
 
 class Assign(AST):
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
-        self.token = op
         self.op = op
         self.right = right
 
+    @property
+    def token(self):
+        return self.op
+
 class Var(AST):
+    __slots__ = ('token', 'value', 'slot', 'level')
+
     def __init__(self, token):
         self.token = token
-        self.value = token.value
+        if not token.deferred:
+            self.value = token.value
+        self.slot = None
+        # nesting depth of the scope that owns the slot; 0 is global
+        self.level = 0
+
+    __getattr__ = load_value
 
 class NoOp(AST):
-    pass
+    __slots__ = ()
+
+class Program(AST):
+    __slots__ = ('name', 'block')
+
+    def __init__(self, name, block):
+        self.name = name
+        self.block = block
+
+class Block(AST):
+    __slots__ = ('declarations', 'compound_statement')
+
+    def __init__(self, declarations, compound_statement):
+        self.declarations = declarations
+        self.compound_statement = compound_statement
+
+class VarDecl(AST):
+    __slots__ = ('var_node', 'type_node')
+
+    def __init__(self, var_node, type_node):
+        self.var_node = var_node
+        self.type_node = type_node
+
+class Type(AST):
+    __slots__ = ('token', 'value')
+
+    def __init__(self, token):
+        self.token = token
+        self.value = token.value
+
+class Param(AST):
+    __slots__ = ('var_node', 'type_node')
+
+    def __init__(self, var_node, type_node):
+        self.var_node = var_node
+        self.type_node = type_node
+
+class ProcedureDecl(AST):
+    # A FUNCTION has a result_type and returns what its body assigns to
+    # its own name. level, index, frame_size and result_slot are filled in
+    # by the Resolver.
+    __slots__ = ('name', 'params', 'block', 'result_type', 'level', 'index', 'frame_size', 'result_slot')
+
+    def __init__(self, name, params, block, result_type=None):
+        self.name = name
+        self.params = params
+        self.block = block
+        self.result_type = result_type
+        self.level = None
+        self.index = None
+        self.frame_size = None
+        self.result_slot = None
+
+class Call(AST):
+    __slots__ = ('token', 'name', 'args', 'procedure')
+
+    def __init__(self, token, args):
+        self.token = token
+        self.name = token.value
+        self.args = args
+        self.procedure = None
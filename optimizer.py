@@ -0,0 +1,163 @@
+from tokens import Token, Tokens, FIXED_TOKENS
+from nodes import Num, UnaryOp, BinOp, Compound, Assign, NoOp, Program, Block, VarDecl, Param, ProcedureDecl, Call
+from interpreter import NodeVisitor, BINARY_OPS, UNARY_OPS
+from typecheck import REAL
+
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, BinOp):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, UnaryOp):
+            stack.append(node.expr)
+        elif isinstance(node, Assign):
+            stack.append(node.left)
+            stack.append(node.right)
+        elif isinstance(node, Compound):
+            stack.extend(node.children)
+        elif isinstance(node, Program):
+            stack.append(node.block)
+        elif isinstance(node, Block):
+            stack.extend(node.declarations)
+            stack.append(node.compound_statement)
+        elif isinstance(node, (VarDecl, Param)):
+            stack.append(node.var_node)
+            stack.append(node.type_node)
+        elif isinstance(node, ProcedureDecl):
+            stack.extend(node.params)
+            if node.result_type is not None:
+                stack.append(node.result_type)
+            stack.append(node.block)
+        elif isinstance(node, Call):
+            stack.extend(node.args)
+    return count
+
+
+def is_int(node, value):
+    return isinstance(node, Num) and type(node.value) is int and node.value == value
+
+
+class Optimizer(NodeVisitor):
+    def __init__(self, declared=None):
+        # variable name -> constant value of its last assignment
+        self.constants = {}
+        # VAR types of a type-checked program; a REAL variable holding an
+        # INTEGER constant propagates it as REAL, as the typed store would
+        self.declared = declared or {}
+        self.removed = 0
+
+    def optimize(self, tree):
+        before = count_nodes(tree)
+        tree = self.visit(tree)
+        self.removed = before - count_nodes(tree)
+        return tree
+
+    def constant(self, value):
+        if isinstance(value, float):
+            return Num(Token(Tokens.REAL_CONST, value))
+        return Num(Token(Tokens.INTEGER, value))
+
+    def visit_BinOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op.type
+        if isinstance(left, Num) and isinstance(right, Num):
+            try:
+                return self.constant(BINARY_OPS[op](left.value, right.value))
+            except ZeroDivisionError:
+                # leave it to fail at run time
+                pass
+        if isinstance(right, UnaryOp) and right.op.type == Tokens.MINUS and op in (Tokens.PLUS, Tokens.MINUS):
+            # a - -b => a + b, a + -b => a - b
+            flipped = FIXED_TOKENS['+' if op == Tokens.MINUS else '-']
+            return self.visit_BinOp(BinOp(left, flipped, right.expr))
+        if op == Tokens.PLUS:
+            if is_int(right, 0):
+                return left
+            if is_int(left, 0):
+                return right
+        elif op == Tokens.MINUS:
+            if is_int(right, 0):
+                return left
+        elif op == Tokens.MUL:
+            if is_int(right, 1):
+                return left
+            if is_int(left, 1):
+                return right
+        if left is node.left and right is node.right:
+            return node
+        return BinOp(left, node.op, right)
+
+    def visit_UnaryOp(self, node):
+        expr = self.visit(node.expr)
+        op = node.op.type
+        if isinstance(expr, Num):
+            return self.constant(UNARY_OPS[op](expr.value))
+        if op == Tokens.PLUS:
+            return expr
+        if isinstance(expr, UnaryOp) and expr.op.type == Tokens.MINUS:
+            # - - x => x
+            return expr.expr
+        if expr is node.expr:
+            return node
+        return UnaryOp(node.op, expr)
+
+    def visit_Num(self, node):
+        return node
+
+    def visit_Program(self, node):
+        return Program(node.name, self.visit(node.block))
+
+    def visit_Block(self, node):
+        declarations = [self.visit(declaration) if isinstance(declaration, ProcedureDecl) else declaration
+                        for declaration in node.declarations]
+        return Block(declarations, self.visit(node.compound_statement))
+
+    def visit_ProcedureDecl(self, node):
+        # a body may run at any point, so it knows no constants from outside
+        saved = self.constants
+        self.constants = {}
+        block = self.visit(node.block)
+        self.constants = saved
+        return ProcedureDecl(node.name, node.params, block, node.result_type)
+
+    def visit_Call(self, node):
+        args = [self.visit(arg) for arg in node.args]
+        # the callee may assign any variable it can see
+        self.constants.clear()
+        return Call(node.token, args)
+
+    def visit_Compound(self, node):
+        root = Compound()
+        for child in node.children:
+            child = self.visit(child)
+            if not isinstance(child, NoOp):
+                root.children.append(child)
+        return root
+
+    def visit_NoOp(self, node):
+        return node
+
+    def visit_Assign(self, node):
+        right = self.visit(node.right)
+        name = node.left.value
+        if isinstance(right, Num):
+            value = right.value
+            if self.declared.get(name) == REAL:
+                value = float(value)
+            self.constants[name] = value
+        else:
+            self.constants.pop(name, None)
+        if right is node.right:
+            return node
+        return Assign(node.left, node.op, right)
+
+    def visit_Var(self, node):
+        if node.value in self.constants:
+            return self.constant(self.constants[node.value])
+        return node
@@ -0,0 +1,155 @@
+import os
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from tokens import Tokens
+from bytescanner import BYTES_TOKEN_PATTERN, BYTES_WHITESPACE_PATTERN, GROUP_KINDS, GROUP_TOKENS
+from tokenstream import TokenBuffer
+from stream import map_file
+
+
+# Below this many bytes per worker, starting processes costs more than it saves.
+MIN_CHUNK = 1 << 20
+
+# A token never contains ';' or whitespace, and a comment never contains '}'.
+BOUNDARY_PATTERN = re.compile(rb'[;\s{]')
+
+
+def safe_boundary(data, pos):
+    """First offset at or after pos where the source can be cut: just after
+    a ';' or a whitespace byte that is not inside a {...} comment."""
+    # inside a comment when the last '{' before pos is still open
+    if data.rfind(b'{', 0, pos) > data.rfind(b'}', 0, pos):
+        pos = data.find(b'}', pos)
+        if pos < 0:
+            return len(data)
+        pos += 1
+    while True:
+        match = BOUNDARY_PATTERN.search(data, pos)
+        if match is None:
+            return len(data)
+        if match.group() != b'{':
+            return match.end()
+        pos = data.find(b'}', match.end())
+        if pos < 0:
+            return len(data)
+        pos += 1
+
+
+def split(data, parts):
+    # (start, end) ranges that together cover data
+    size = len(data)
+    bounds = [0]
+    for part in range(1, parts):
+        bound = safe_boundary(data, max(size * part // parts, bounds[-1]))
+        if bound >= size:
+            break
+        if bound > bounds[-1]:
+            bounds.append(bound)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def lex_range(data, start, end):
+    # kinds, start offsets and values of the tokens in data[start:end];
+    # offsets are absolute, so ranges concatenate without adjustment
+    kinds = array('B')
+    offsets = array('q')
+    values = []
+    group_kinds = GROUP_KINDS
+    group_tokens = GROUP_TOKENS
+    match = BYTES_TOKEN_PATTERN.scanner(data, start, end).match
+    pos = start
+    while True:
+        m = match()
+        if m is None:
+            break
+        group = m.lastindex
+        begin, pos = m.span(group)
+        kind = group_kinds[group]
+        kinds.append(kind)
+        offsets.append(begin)
+        if group_tokens[group] is not None:
+            values.append(None)
+        elif kind == Tokens.INTEGER:
+            values.append(int(data[begin:pos]))
+        elif kind == Tokens.REAL_CONST:
+            values.append(float(data[begin:pos]))
+        else:
+            values.append(bytes(data[begin:pos]).decode('utf-8'))
+    pos = BYTES_WHITESPACE_PATTERN.match(data, pos, end).end()
+    if pos < end:
+        raise Exception('Error parsing input')
+    return kinds.tobytes(), offsets.tobytes(), values
+
+
+# The source each worker process attached to in attach_file/attach_shared;
+# workers read it in place, so only offsets and results cross processes.
+worker_source = None
+
+
+def attach_file(path):
+    global worker_source
+    worker_source = map_file(path)
+
+
+def attach_shared(name):
+    global worker_source
+    worker_source = shared_memory.SharedMemory(name=name)
+
+
+def lex_worker_range(bounds):
+    source = worker_source
+    if isinstance(source, shared_memory.SharedMemory):
+        return lex_range(source.buf, bounds[0], bounds[1])
+    return lex_range(source, bounds[0], bounds[1])
+
+
+def stitch(data, results):
+    buffer = TokenBuffer()
+    for kinds, offsets, values in results:
+        buffer.kinds.frombytes(kinds)
+        buffer.offsets.frombytes(offsets)
+        buffer.values.extend(values)
+    buffer.append_eof(len(data))
+    return buffer
+
+
+def tokenize_parallel(data, workers, initializer, initargs, chunks=None):
+    ranges = split(data, chunks or workers)
+    if workers <= 1 or len(ranges) == 1:
+        return stitch(data, [lex_range(data, start, end) for start, end in ranges])
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        return stitch(data, executor.map(lex_worker_range, ranges))
+
+
+def default_workers(size):
+    return max(1, min(os.cpu_count() or 1, size // MIN_CHUNK))
+
+
+def tokenize_file(path, workers=None, chunks=None):
+    """Lex a file on several cores into a TokenBuffer for BufferedParser.
+
+    Every worker maps the file itself, so the source is never pickled.
+    """
+    data = map_file(path)
+    if workers is None:
+        workers = default_workers(len(data))
+    return tokenize_parallel(data, workers, attach_file, (path,), chunks)
+
+
+def tokenize_bytes(data, workers=None, chunks=None):
+    """Lex in-memory UTF-8 source on several cores, through one copy into
+    shared memory."""
+    if workers is None:
+        workers = default_workers(len(data))
+    if workers <= 1 or not data:
+        return tokenize_parallel(data, 1, None, (), chunks)
+    shared = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shared.buf[:len(data)] = data
+        return tokenize_parallel(data, workers, attach_shared, (shared.name,), chunks)
+    finally:
+        shared.close()
+        shared.unlink()
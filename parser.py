@@ -1,5 +1,10 @@
 from tokens import Token, Tokens
-from nodes import Num, UnaryOp, BinOp, Compound, Var, Assign, NoOp
+from nodes import Num, UnaryOp, BinOp, Compound, Var, Assign, NoOp, Program, Block, VarDecl, Type, Param, ProcedureDecl, Call
+
+
+TERM_OPS = frozenset((Tokens.MUL, Tokens.DIV, Tokens.INTEGER_DIV))
+NUMBER_CONSTS = frozenset((Tokens.INTEGER, Tokens.REAL_CONST))
+EXPR_OPS = frozenset((Tokens.PLUS, Tokens.MINUS))
 
 
 class Parser:
@@ -26,8 +31,8 @@ class Parser:
             self.eat(Tokens.MINUS)
             node = UnaryOp(token, self.factor())
             return node
-        elif token.type == Tokens.INTEGER:
-            self.eat(Tokens.INTEGER)
+        elif token.type in NUMBER_CONSTS:
+            self.eat(token.type)
             return Num(token)
         elif token.type == Tokens.LPAREN:
             self.eat(Tokens.LPAREN)
@@ -36,22 +41,26 @@ class Parser:
             return node
         else:
             node = self.variable()
+            if self.current_token.type == Tokens.LPAREN:
+                return self.call(node.token)
             return node
     
     def term(self):
         node = self.factor()
-        while self.current_token.type in (Tokens.MUL, Tokens.DIV):
+        while self.current_token.type in TERM_OPS:
             token = self.current_token
             if token.type == Tokens.MUL:
                 self.eat(Tokens.MUL)
             elif token.type == Tokens.DIV:
                 self.eat(Tokens.DIV)
+            elif token.type == Tokens.INTEGER_DIV:
+                self.eat(Tokens.INTEGER_DIV)
             node = BinOp(node, token, self.factor())
         return node
     
     def expr(self):
         node = self.term()
-        while self.current_token.type in (Tokens.PLUS, Tokens.MINUS):
+        while self.current_token.type in EXPR_OPS:
             token = self.current_token
             if token.type == Tokens.PLUS:
                 self.eat(Tokens.PLUS)
@@ -61,10 +70,78 @@ class Parser:
         return node
     
     def program(self):
-        node = self.compound_statement()
+        # A bare BEGIN ... END. block is still accepted as a whole program.
+        if self.current_token.type != Tokens.PROGRAM:
+            node = self.compound_statement()
+            self.eat(Tokens.DOT)
+            return node
+        self.eat(Tokens.PROGRAM)
+        var_node = self.variable()
+        self.eat(Tokens.SEMI)
+        node = Program(var_node.value, self.block())
         self.eat(Tokens.DOT)
         return node
 
+    def block(self):
+        declarations = self.declarations()
+        return Block(declarations, self.compound_statement())
+
+    def declarations(self):
+        declarations = []
+        if self.current_token.type == Tokens.VAR:
+            self.eat(Tokens.VAR)
+            while self.current_token.type == Tokens.ID:
+                declarations.extend(self.variable_declaration())
+                self.eat(Tokens.SEMI)
+        while self.current_token.type in (Tokens.PROCEDURE, Tokens.FUNCTION):
+            declarations.append(self.procedure_declaration())
+        return declarations
+
+    def procedure_declaration(self):
+        token = self.current_token
+        self.eat(token.type)
+        name = self.variable().value
+        params = []
+        if self.current_token.type == Tokens.LPAREN:
+            self.eat(Tokens.LPAREN)
+            params = self.formal_parameter_list()
+            self.eat(Tokens.RPAREN)
+        result_type = None
+        if token.type == Tokens.FUNCTION:
+            self.eat(Tokens.COLON)
+            result_type = self.type_spec()
+        self.eat(Tokens.SEMI)
+        block = self.block()
+        self.eat(Tokens.SEMI)
+        return ProcedureDecl(name, params, block, result_type)
+
+    def formal_parameter_list(self):
+        params = self.formal_parameters()
+        while self.current_token.type == Tokens.SEMI:
+            self.eat(Tokens.SEMI)
+            params.extend(self.formal_parameters())
+        return params
+
+    def formal_parameters(self):
+        return [Param(node.var_node, node.type_node) for node in self.variable_declaration()]
+
+    def variable_declaration(self):
+        var_nodes = [self.variable()]
+        while self.current_token.type == Tokens.COMMA:
+            self.eat(Tokens.COMMA)
+            var_nodes.append(self.variable())
+        self.eat(Tokens.COLON)
+        type_node = self.type_spec()
+        return [VarDecl(var_node, type_node) for var_node in var_nodes]
+
+    def type_spec(self):
+        token = self.current_token
+        if token.type == Tokens.INTEGER_TYPE:
+            self.eat(Tokens.INTEGER_TYPE)
+        else:
+            self.eat(Tokens.REAL_TYPE)
+        return Type(token)
+
     def compound_statement(self):
         self.eat(Tokens.BEGIN)
         nodes = self.statement_list()
@@ -88,19 +165,37 @@ class Parser:
         if self.current_token.type == Tokens.BEGIN:
             node = self.compound_statement()
         elif self.current_token.type == Tokens.ID:
-            node = self.assignment_statement()
+            left = self.variable()
+            if self.current_token.type == Tokens.ASSIGN:
+                node = self.assignment_statement(left)
+            else:
+                node = self.call(left.token)
         else:
             node = self.empty()
         return node
 
-    def assignment_statement(self):
-        left = self.variable()
+    def assignment_statement(self, left=None):
+        if left is None:
+            left = self.variable()
         token = self.current_token
         self.eat(Tokens.ASSIGN)
         right = self.expr()
         node = Assign(left, token, right)
         return node
 
+    def call(self, token):
+        # the name has been eaten; parameterless calls may drop the ()
+        args = []
+        if self.current_token.type == Tokens.LPAREN:
+            self.eat(Tokens.LPAREN)
+            if self.current_token.type != Tokens.RPAREN:
+                args.append(self.expr())
+                while self.current_token.type == Tokens.COMMA:
+                    self.eat(Tokens.COMMA)
+                    args.append(self.expr())
+            self.eat(Tokens.RPAREN)
+        return Call(token, args)
+
     def variable(self):
         node = Var(self.current_token)
         self.eat(Tokens.ID)
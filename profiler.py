@@ -0,0 +1,113 @@
+import time
+from collections import defaultdict
+from nodes import Assign
+from scanner import PositionScanner
+from parser import Parser
+from resolver import SlotInterpreter
+from optimizer import Optimizer, count_nodes
+
+
+class TokenList:
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+
+    def get_next_token(self):
+        return next(self.tokens)
+
+
+class ProfilingInterpreter(SlotInterpreter):
+    # visit below wraps the inherited one
+    FRAMES_PER_NODE = 3
+
+    def __init__(self, parser):
+        super().__init__(parser)
+        self.visits = defaultdict(int)
+        self.cumulative = defaultdict(float)
+        # node type call path -> time spent in the last node itself
+        self.stacks = defaultdict(float)
+        self.line_counts = defaultdict(int)
+        self.line_times = defaultdict(float)
+        self.path = []
+        self.child_times = [0.0]
+
+    def visit(self, node):
+        name = type(node).__name__
+        self.path.append(name)
+        self.child_times.append(0.0)
+        start = time.perf_counter()
+        try:
+            return super().visit(node)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.child_times.pop()
+            self.child_times[-1] += elapsed
+            self.visits[name] += 1
+            # recursive node types count once per outermost visit
+            if name not in self.path[:-1]:
+                self.cumulative[name] += elapsed
+            self.stacks[tuple(self.path)] += elapsed - children
+            self.path.pop()
+            if isinstance(node, Assign):
+                lineno = node.left.lineno
+                self.line_counts[lineno] += 1
+                self.line_times[lineno] += elapsed
+
+
+class Profile:
+    def __init__(self):
+        self.phases = {}
+        self.tokens = 0
+        self.nodes = 0
+        self.interpreter = None
+
+    def run(self, text, optimize=False):
+        start = time.perf_counter()
+        tokens = list(PositionScanner(text).tokens())
+        self.phases['lex'] = time.perf_counter() - start
+        self.tokens = len(tokens) - 1
+
+        start = time.perf_counter()
+        tree = Parser(TokenList(tokens)).parse()
+        self.phases['parse'] = time.perf_counter() - start
+        self.nodes = count_nodes(tree)
+
+        if optimize:
+            start = time.perf_counter()
+            tree = Optimizer().optimize(tree)
+            self.phases['optimize'] = time.perf_counter() - start
+
+        self.interpreter = ProfilingInterpreter(None)
+        start = time.perf_counter()
+        self.interpreter.execute(tree)
+        self.phases['interpret'] = time.perf_counter() - start
+        return self.interpreter.GLOBAL_SCOPE
+
+    def report(self, lines=10):
+        out = []
+        total = sum(self.phases.values())
+        out.append('{:<12} {:>10} {:>7}'.format('phase', 'seconds', '%'))
+        for phase, elapsed in self.phases.items():
+            out.append('{:<12} {:>10.6f} {:>6.1f}%'.format(phase, elapsed, 100 * elapsed / total if total else 0))
+        out.append('')
+        out.append('{} tokens, {} nodes'.format(self.tokens, self.nodes))
+        out.append('')
+        out.append('{:<12} {:>10} {:>12}'.format('node', 'visits', 'cumulative'))
+        interpreter = self.interpreter
+        for name in sorted(interpreter.visits, key=interpreter.cumulative.get, reverse=True):
+            out.append('{:<12} {:>10} {:>12.6f}'.format(name, interpreter.visits[name], interpreter.cumulative[name]))
+        out.append('')
+        out.append('{:<12} {:>10} {:>12}'.format('line', 'executed', 'seconds'))
+        hot = sorted(interpreter.line_times, key=interpreter.line_times.get, reverse=True)[:lines]
+        for lineno in hot:
+            out.append('{:<12} {:>10} {:>12.6f}'.format(lineno, interpreter.line_counts[lineno], interpreter.line_times[lineno]))
+        return '\n'.join(out)
+
+    def write_folded(self, path):
+        # Brendan Gregg's collapsed stack format, in microseconds, as read by
+        # flamegraph.pl, speedscope and inferno.
+        with open(path, 'w') as f:
+            for phase in ('lex', 'parse', 'optimize'):
+                if phase in self.phases:
+                    f.write('{} {}\n'.format(phase, round(self.phases[phase] * 1e6)))
+            for stack, elapsed in self.interpreter.stacks.items():
+                f.write('interpret;{} {}\n'.format(';'.join(stack), round(elapsed * 1e6)))
@@ -0,0 +1,342 @@
+import sys
+import threading
+
+from nodes import Num, BinOp, UnaryOp, Var, Assign, Compound, Program, ProcedureDecl, Call
+from interpreter import Interpreter
+
+
+MAX_CALL_DEPTH = 1000
+
+# Before 3.11 every Python call also takes C stack, about 500 bytes here,
+# which the recursion limit knows nothing about: raised far enough, the
+# process crashes instead of raising RecursionError. There, execute() runs
+# on a thread with a DEEP_STACK byte stack and never raises the limit past
+# what that holds.
+C_STACK_FRAMES = sys.version_info < (3, 11)
+DEEP_STACK = 256 * 1024 * 1024
+MAX_FRAMES = DEEP_STACK // 1024 if C_STACK_FRAMES else 2 ** 31 - 1
+
+
+def deep_call(function, *args):
+    # function(*args) on a thread with a DEEP_STACK stack
+    outcome = []
+
+    def target():
+        try:
+            outcome.append((True, function(*args)))
+        except BaseException as error:
+            outcome.append((False, error))
+
+    previous = threading.stack_size(DEEP_STACK)
+    try:
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+    finally:
+        threading.stack_size(previous)
+    thread.join()
+    ok, value = outcome[0]
+    if not ok:
+        raise value
+    return value
+
+
+class Scope:
+    def __init__(self, parent, level, slots=None):
+        self.parent = parent
+        self.level = level
+        # variable name -> slot index in the frame of this scope
+        self.slots = {} if slots is None else slots
+        # names a run has assigned by the statement being resolved; unused
+        # for the globals, whose slots are made by their first assignment
+        self.assigned = set()
+        self.procedures = {}
+
+    def declare(self, name):
+        if name in self.slots:
+            raise Exception('Duplicate identifier {!r}'.format(name))
+        slot = self.slots[name] = len(self.slots)
+        return slot
+
+
+class Resolver:
+    """Gives every Var the level and slot of its variable, and checks
+    before anything runs that every read follows an assignment.
+
+    Programs are straight-line, so resolving each procedure body at its
+    first call visits statements in the order every run executes them:
+    globals get slots in order of first assignment, and a read unassigned
+    here is unassigned on every run. Bodies no run reaches are resolved
+    after the main program, unchecked.
+    """
+
+    def __init__(self, max_depth=MAX_CALL_DEPTH):
+        # global variable name -> slot index, in order of first assignment
+        self.slots = {}
+        self.scope = Scope(None, 0, self.slots)
+        # every declaration, by ProcedureDecl.index
+        self.procedures = []
+        self.max_level = 0
+        self.max_depth = max_depth
+        # declarations not resolved yet -> the scope declaring them
+        self.unresolved = {}
+        self.running = True
+        self.depth = 0
+        # most nodes from a body down to a call in it, counting both; the
+        # interpreter nests a few Python frames per node
+        self.call_path = 0
+        # Python frames the nested resolve_procedure calls may take
+        self.limit = 0
+        self.frames = 0
+
+    def resolve(self, tree):
+        self.limit = sys.getrecursionlimit()
+        try:
+            if isinstance(tree, Program):
+                tree = tree.block
+            if isinstance(tree, Compound):
+                self.compound(tree, 1)
+            else:
+                self.block(tree)
+            self.running = False
+            while self.unresolved:
+                self.resolve_procedure(next(iter(self.unresolved)))
+        finally:
+            sys.setrecursionlimit(self.limit)
+        return list(self.slots)
+
+    def block(self, node):
+        scope = self.scope
+        for declaration in node.declarations:
+            if isinstance(declaration, ProcedureDecl):
+                if declaration.name in scope.procedures:
+                    raise Exception('Duplicate identifier {!r}'.format(declaration.name))
+                # registered up front, so siblings may call each other
+                scope.procedures[declaration.name] = declaration
+                self.unresolved[declaration] = scope
+            elif scope.level:
+                scope.declare(declaration.var_node.value)
+        self.compound(node.compound_statement, 1)
+
+    def resolve_procedure(self, node):
+        outer = self.scope
+        parent = self.unresolved.pop(node)
+        scope = Scope(parent, parent.level + 1)
+        # parameters take the first slots, in order
+        for param in node.params:
+            name = param.var_node.value
+            scope.declare(name)
+            scope.assigned.add(name)
+        if node.result_type is not None:
+            node.result_slot = scope.declare(node.name)
+        node.level = scope.level
+        node.index = len(self.procedures)
+        self.procedures.append(node)
+        self.max_level = max(self.max_level, scope.level)
+        self.scope = scope
+        self.block(node.block)
+        self.scope = outer
+        node.frame_size = len(scope.slots)
+        if self.running and node.result_type is not None and node.name not in scope.assigned:
+            raise NameError(repr(node.name))
+
+    def compound(self, node, path):
+        # path counts the nodes from the body down to this one
+        for child in node.children:
+            kind = type(child)
+            if kind is Assign:
+                self.expression(child.right, path + 2)
+                self.assign(child.left)
+            elif kind is Call:
+                self.call(child, path + 1)
+            elif kind is Compound:
+                self.compound(child, path + 1)
+
+    def expression(self, node, path):
+        # exact types, as in IterativeInterpreter; numbers need nothing and
+        # are most leaves, so they are skipped before the call
+        kind = type(node)
+        if kind is BinOp:
+            if type(node.left) is not Num:
+                self.expression(node.left, path + 1)
+            if type(node.right) is not Num:
+                self.expression(node.right, path + 1)
+        elif kind is Var:
+            self.read(node)
+        elif kind is UnaryOp:
+            self.expression(node.expr, path + 1)
+        elif kind is Call:
+            self.call(node, path)
+            if node.procedure.result_type is None:
+                raise TypeError('procedure {!r} has no value'.format(node.name))
+
+    def read(self, node):
+        name = node.value
+        scope = self.scope
+        while scope.parent is not None:
+            slot = scope.slots.get(name)
+            if slot is not None:
+                if self.running and name not in scope.assigned:
+                    raise NameError(repr(name))
+                node.level = scope.level
+                node.slot = slot
+                return
+            scope = scope.parent
+        # a running program gives a global its slot on first assignment
+        slot = self.slots.get(name)
+        if slot is not None:
+            node.level = 0
+            node.slot = slot
+            return
+        if self.running:
+            raise NameError(repr(name))
+        # a global only unreached code reads; it never gets a value
+        node.level = 0
+        node.slot = self.slots.setdefault(name, len(self.slots))
+
+    def assign(self, node):
+        # names a procedure neither declares nor finds in an enclosing
+        # scope are globals, as in the main program
+        name = node.value
+        scope = self.scope
+        while name not in scope.slots and scope.parent is not None:
+            scope = scope.parent
+        if scope.parent is None:
+            slot = scope.slots.setdefault(name, len(scope.slots))
+        else:
+            slot = scope.slots[name]
+            scope.assigned.add(name)
+        node.level = scope.level
+        node.slot = slot
+
+    def call(self, node, path):
+        for arg in node.args:
+            self.expression(arg, path + 1)
+        scope = self.scope
+        while scope is not None and node.name not in scope.procedures:
+            scope = scope.parent
+        if scope is None:
+            raise NameError(repr(node.name))
+        procedure = scope.procedures[node.name]
+        if len(node.args) != len(procedure.params):
+            raise TypeError('{!r} takes {} arguments, {} given'.format(
+                node.name, len(procedure.params), len(node.args)))
+        node.procedure = procedure
+        if not self.running:
+            return
+        self.call_path = max(self.call_path, path)
+        if procedure in self.unresolved:
+            # a run nests at least this deep, and on the same calls
+            if self.depth >= self.max_depth:
+                raise RecursionError('maximum call depth {} exceeded in {!r}'.format(self.max_depth, node.name))
+            # call, resolve_procedure, block and expression per node
+            frames = path + 3
+            if self.limit + self.frames + frames > MAX_FRAMES:
+                raise RecursionError('calls nested {} deep in {!r} exceed the stack'.format(self.depth + 1, node.name))
+            self.depth += 1
+            self.frames += frames
+            if self.limit + self.frames > sys.getrecursionlimit():
+                sys.setrecursionlimit(self.limit + self.frames)
+            self.resolve_procedure(procedure)
+            self.depth -= 1
+            self.frames -= frames
+
+
+class SlotInterpreter(Interpreter):
+    # Python frames per node on the way from one call down to the next:
+    # visit and the visit_ method
+    FRAMES_PER_NODE = 2
+
+    def __init__(self, parser, max_depth=MAX_CALL_DEPTH):
+        super().__init__(parser)
+        self.slots = []
+        # display[level] is the frame of the innermost active scope at
+        # that nesting level; display[0] holds the globals
+        self.display = [self.slots]
+        self.max_depth = max_depth
+        # max_depth, or less where the stack cannot hold that many calls
+        self.depth_limit = max_depth
+        self.depth = 0
+        # per procedure: frames free for reuse, and an all-None template
+        self.pools = []
+        self.blanks = []
+        # node class -> bound visit_ method
+        self.methods = {}
+
+    def visit(self, node):
+        # NodeVisitor.visit, with the method looked up once per node class
+        method = self.methods.get(type(node))
+        if method is None:
+            method = self.methods[type(node)] = getattr(self, 'visit_' + type(node).__name__, self.generic_visit)
+        return method(node)
+
+    def visit_ProcedureDecl(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        left = node.left
+        self.display[left.level][left.slot] = self.visit(node.right)
+
+    def visit_Var(self, node):
+        # the Resolver has checked that every read follows an assignment
+        return self.display[node.level][node.slot]
+
+    def visit_Call(self, node):
+        procedure = node.procedure
+        if self.depth >= self.depth_limit:
+            raise RecursionError('maximum call depth {} exceeded in {!r}'.format(self.depth_limit, node.name))
+        pool = self.pools[procedure.index]
+        frame = pool.pop() if pool else self.blanks[procedure.index][:]
+        # arguments are evaluated in the caller's scope, straight into slots
+        slot = 0
+        for arg in node.args:
+            frame[slot] = self.visit(arg)
+            slot += 1
+        display = self.display
+        level = procedure.level
+        saved = display[level]
+        display[level] = frame
+        self.depth += 1
+        try:
+            self.visit(procedure.block.compound_statement)
+        finally:
+            self.depth -= 1
+            display[level] = saved
+        result = None
+        if procedure.result_slot is not None:
+            result = frame[procedure.result_slot]
+        frame[:] = self.blanks[procedure.index]
+        pool.append(frame)
+        return result
+
+    def execute(self, tree):
+        if C_STACK_FRAMES:
+            deep_call(self.run, tree)
+        else:
+            self.run(tree)
+
+    def run(self, tree):
+        resolver = Resolver(self.max_depth)
+        names = resolver.resolve(tree)
+        self.slots = [None] * len(names)
+        self.display = [self.slots] + [None] * resolver.max_level
+        self.depth = 0
+        self.blanks = [[None] * procedure.frame_size for procedure in resolver.procedures]
+        # one frame per procedure up front; recursion adds more as needed
+        self.pools = [[blank[:]] for blank in self.blanks]
+        # room for max_depth calls, each as deep in Python frames as the
+        # deepest call site the Resolver found
+        limit = sys.getrecursionlimit()
+        frames = resolver.call_path * self.FRAMES_PER_NODE
+        self.depth_limit = self.max_depth
+        if frames and limit + self.max_depth * frames > MAX_FRAMES:
+            self.depth_limit = (MAX_FRAMES - limit) // frames
+        sys.setrecursionlimit(limit + self.depth_limit * frames)
+        try:
+            self.visit(tree)
+        finally:
+            sys.setrecursionlimit(limit)
+        # globals only unreached code assigns are never set
+        self.GLOBAL_SCOPE = {name: value for name, value in zip(names, self.slots) if value is not None}
+
+    def interpret(self):
+        self.execute(self.parser.parse())
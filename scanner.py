@@ -0,0 +1,83 @@
+import re
+from tokens import Token, Tokens, PositionedToken, FIXED_TOKENS, EOF_TOKEN
+from lexer import RESERVED_KEYWORDS
+
+
+# One alternative per token class; match.lastindex tells which one fired.
+# Group 1 is the skipped whitespace.
+NUMBER_GROUP = 2
+ID_GROUP = 3
+FIXED_GROUP = 4
+
+# Whitespace and {...} comments, matched atomically so a failed match
+# never backtracks into the run. A lookahead captures the longest run and
+# the backreference consumes exactly that; possessive *+ would need 3.11.
+SKIP = r'(?=(?P<skip>(?:\s|\{[^}]*\})*))(?P=skip)'
+
+TOKEN_PATTERN = re.compile(
+    SKIP + r'(?:'
+    r'(\d+(?:\.\d+)?)'
+    r'|([^\W\d_][^\W_]*)'
+    r'|(' + '|'.join(re.escape(lexeme) for lexeme in sorted(FIXED_TOKENS, key=len, reverse=True)) + r')'
+    r')'
+)
+WHITESPACE_PATTERN = re.compile(SKIP)
+
+
+class Scanner:
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self._match = TOKEN_PATTERN.match
+
+    def error(self):
+        raise Exception('Error parsing input')
+
+    def get_next_token(self):
+        match = self._match(self.text, self.pos)
+        if match is None:
+            self.pos = WHITESPACE_PATTERN.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                self.error()
+            return EOF_TOKEN
+        self.pos = match.end()
+        return self._token(match)
+
+    def _token(self, match):
+        group = match.lastindex
+        if group == NUMBER_GROUP:
+            value = match.group(NUMBER_GROUP)
+            if '.' in value:
+                return Token(Tokens.REAL_CONST, float(value))
+            return Token(Tokens.INTEGER, int(value))
+        if group == ID_GROUP:
+            value = match.group(ID_GROUP)
+            return RESERVED_KEYWORDS.get(value) or Token(Tokens.ID, value)
+        return FIXED_TOKENS[match.group(FIXED_GROUP)]
+
+    def tokens(self):
+        while True:
+            token = self.get_next_token()
+            yield token
+            if token.type == Tokens.EOF:
+                return
+
+
+class PositionScanner(Scanner):
+    # Stamps every token with its 1-based line and column. Shared tokens
+    # cannot carry a position, so each one is copied.
+    def __init__(self, text):
+        super().__init__(text)
+        self.lineno = 1
+        self.line_start = 0
+
+    def get_next_token(self):
+        start = self.pos
+        token = super().get_next_token()
+        begin = WHITESPACE_PATTERN.match(self.text, start).end()
+        # newlines inside comments count too
+        newlines = self.text.count('\n', start, begin)
+        if newlines:
+            self.lineno += newlines
+            self.line_start = self.text.rfind('\n', start, begin) + 1
+        return PositionedToken(token.type, token.value, self.lineno, begin - self.line_start + 1)
@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from scanner import Scanner
+from parser import Parser
+from resolver import SlotInterpreter
+
+
+def evaluate(text):
+    # Runs in a worker process; every request gets its own interpreter.
+    try:
+        interpreter = SlotInterpreter(Parser(Scanner(text)))
+        interpreter.interpret()
+        return {'scope': interpreter.GLOBAL_SCOPE}
+    except Exception as e:
+        return {'error': '{}: {}'.format(type(e).__name__, e)}
+
+
+def warm_up():
+    return evaluate('BEGIN a := 1 END.')
+
+
+class Workers:
+    """A multiprocessing context that keeps every process it starts, so a
+    pool's workers can be killed without reaching into the executor."""
+
+    def __init__(self):
+        self.context = multiprocessing.get_context()
+        self.processes = []
+
+    def Process(self, *args, **kwargs):
+        process = self.context.Process(*args, **kwargs)
+        self.processes.append(process)
+        return process
+
+    def __getattr__(self, name):
+        return getattr(self.context, name)
+
+
+def terminate(executor, workers):
+    # shutdown() alone waits for running programs, which may never end
+    for process in workers.processes:
+        if process.is_alive():
+            process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Server:
+    def __init__(self, workers=None, timeout=5.0):
+        self.workers = workers or os.cpu_count()
+        self.timeout = timeout
+        self.executor = None
+        self.slots = None
+        # executor -> requests still running on it
+        self.running = {}
+        # executor -> the Workers context that started its processes
+        self.contexts = {}
+
+    def spawn(self):
+        workers = Workers()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=workers)
+        self.running[self.executor] = 0
+        self.contexts[self.executor] = workers
+        loop = asyncio.get_running_loop()
+        return [loop.run_in_executor(self.executor, warm_up) for _ in range(self.workers)]
+
+    async def start(self):
+        self.slots = asyncio.Semaphore(self.workers)
+        # Start every worker up front so no request pays for spawning one.
+        await asyncio.gather(*self.spawn())
+
+    def close(self):
+        for executor in list(self.running):
+            terminate(executor, self.contexts.pop(executor))
+        self.running.clear()
+
+    async def run(self, text):
+        await self.slots.acquire()
+        executor = self.executor
+        self.running[executor] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(executor, evaluate, text), self.timeout)
+        except asyncio.TimeoutError:
+            # The program cannot be stopped inside its worker, so new
+            # requests go to a fresh pool, and the old one is killed once
+            # the other requests on it are done.
+            if executor is self.executor:
+                self.spawn()
+            return {'error': 'TimeoutError: program ran longer than {}s'.format(self.timeout)}
+        except BrokenProcessPool:
+            # A worker died, which fails every request on the pool; later
+            # requests go to a fresh one.
+            if executor is self.executor:
+                self.spawn()
+            return {'error': 'BrokenProcessPool: worker process died'}
+        finally:
+            self.slots.release()
+            self.running[executor] -= 1
+            if executor is not self.executor and not self.running[executor]:
+                del self.running[executor]
+                terminate(executor, self.contexts.pop(executor))
+
+    async def handle(self, reader, writer):
+        # One JSON request per line: {"program": "BEGIN ... END."}
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"error": "BadRequest: request too large"}\n')
+                    break
+                if not line:
+                    break
+                try:
+                    text = json.loads(line)['program']
+                except (ValueError, KeyError, TypeError) as e:
+                    result = {'error': 'BadRequest: {}'.format(e)}
+                else:
+                    result = await self.run(text)
+                writer.write(json.dumps(result).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(args):
+    server = Server(args.workers, args.timeout)
+    await server.start()
+    if args.unix:
+        listener = await asyncio.start_unix_server(server.handle, path=args.unix, limit=args.max_request)
+    else:
+        listener = await asyncio.start_server(server.handle, args.host, args.port, limit=args.max_request)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description='Serve Pascal program evaluation over a socket')
+    argparser.add_argument('--unix', help='listen on this Unix socket instead of TCP')
+    argparser.add_argument('--host', default='127.0.0.1')
+    argparser.add_argument('--port', type=int, default=8765)
+    argparser.add_argument('--workers', type=int, default=os.cpu_count())
+    argparser.add_argument('--timeout', type=float, default=5.0,
+                           help='seconds a program may run before the request fails')
+    argparser.add_argument('--max-request', type=int, default=16 * 1024 * 1024,
+                           help='largest request line in bytes')
+    args = argparser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
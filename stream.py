@@ -0,0 +1,58 @@
+import codecs
+import io
+import mmap
+from tokens import EOF_TOKEN
+from scanner import Scanner, WHITESPACE_PATTERN
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StreamLexer(Scanner):
+    def __init__(self, source, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+        super().__init__('')
+        self.source = source
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.source.read(self.chunk_size)
+        if isinstance(chunk, str):
+            data = chunk
+        else:
+            data = self.decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+        self.text = self.text[self.pos:] + data
+        self.pos = 0
+
+    def get_next_token(self):
+        match = self._match(self.text, self.pos)
+        # A match that ends within one character of the end of the buffer may
+        # continue in the next chunk (identifiers, digit runs, ':' of ':=',
+        # '3.' of '3.14'), so read more first.
+        while not self.eof and (match is None or match.end() + 1 >= len(self.text)):
+            self._fill()
+            match = self._match(self.text, self.pos)
+        if match is None:
+            self.pos = WHITESPACE_PATTERN.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                self.error()
+            return EOF_TOKEN
+        self.pos = match.end()
+        return self._token(match)
+
+
+def map_file(path):
+    # read-only mapping of the whole file; b'' when it is empty, since
+    # empty files cannot be mapped
+    with open(path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b''
+
+
+def open_stream(path, chunk_size=CHUNK_SIZE):
+    return StreamLexer(map_file(path) or io.BytesIO(), chunk_size)
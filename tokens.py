@@ -1,29 +1,90 @@
-class Tokens:
-    INTEGER = 'INTEGER'
-    PLUS = 'PLUS'
-    MINUS = 'MINUS'
-    EOF = 'EOF'
-    MUL = 'MUL'
-    DIV = 'DIV'
-    LPAREN = '('
-    RPAREN = ')'
-    OP_LIST = (PLUS, MINUS, MUL, DIV)
-
-    BEGIN = 'BEGIN'
-    END = 'END'
-    ID = 'ID'
-    DOT = 'DOT'
-    ASSIGN = 'ASSIGN'
-    SEMI = 'SEMI'
-    
+from enum import IntEnum
+
+
+class Tokens(IntEnum):
+    INTEGER = 1
+    PLUS = 2
+    MINUS = 3
+    EOF = 4
+    MUL = 5
+    DIV = 6
+    LPAREN = 7
+    RPAREN = 8
+
+    BEGIN = 9
+    END = 10
+    ID = 11
+    DOT = 12
+    ASSIGN = 13
+    SEMI = 14
+
+    REAL_CONST = 15
+    INTEGER_DIV = 16
+    PROGRAM = 17
+    VAR = 18
+    COLON = 19
+    COMMA = 20
+    INTEGER_TYPE = 21
+    REAL_TYPE = 22
+    PROCEDURE = 23
+    FUNCTION = 24
+
+OP_LIST = (Tokens.PLUS, Tokens.MINUS, Tokens.MUL, Tokens.DIV, Tokens.INTEGER_DIV)
+
 
 class Token:
+    __slots__ = ('type', 'value')
+
+    # only PositionedToken records where it came from
+    lineno = None
+    column = None
+    # a LazyToken decodes its value on first read, so nodes wait for that too
+    deferred = False
+
     def __init__(self, type, value):
         self.type = type
         self.value = value
 
     def __str__(self):
-        return 'Token({}, {})'.format(self.type, repr(self.value))
+        return 'Token({}, {})'.format(self.type.name, repr(self.value))
 
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
+
+
+class FixedToken(Token):
+    __slots__ = ()
+
+    def __init__(self, type, value):
+        object.__setattr__(self, 'type', type)
+        object.__setattr__(self, 'value', value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is shared and cannot be modified'.format(self))
+
+
+class PositionedToken(Token):
+    __slots__ = ('lineno', 'column')
+
+    def __init__(self, type, value, lineno, column):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.column = column
+
+
+# Tokens whose value never varies are allocated once and shared.
+FIXED_TOKENS = {
+    ':=': FixedToken(Tokens.ASSIGN, ':='),
+    '+': FixedToken(Tokens.PLUS, '+'),
+    '-': FixedToken(Tokens.MINUS, '-'),
+    '*': FixedToken(Tokens.MUL, '*'),
+    '/': FixedToken(Tokens.DIV, '/'),
+    '(': FixedToken(Tokens.LPAREN, '('),
+    ')': FixedToken(Tokens.RPAREN, ')'),
+    ';': FixedToken(Tokens.SEMI, ';'),
+    '.': FixedToken(Tokens.DOT, '.'),
+    ':': FixedToken(Tokens.COLON, ':'),
+    ',': FixedToken(Tokens.COMMA, ','),
+}
+EOF_TOKEN = FixedToken(Tokens.EOF, None)
@@ -0,0 +1,212 @@
+from array import array
+from tokens import Token, Tokens, FIXED_TOKENS, EOF_TOKEN
+from lexer import RESERVED_KEYWORDS
+from scanner import TOKEN_PATTERN, WHITESPACE_PATTERN, NUMBER_GROUP, ID_GROUP
+from nodes import Num, UnaryOp, BinOp, Var, Assign
+from parser import Parser, TERM_OPS, EXPR_OPS, NUMBER_CONSTS
+
+
+KINDS = {token.type: token for token in FIXED_TOKENS.values()}
+KINDS.update((token.type, token) for token in RESERVED_KEYWORDS.values())
+KINDS[Tokens.EOF] = EOF_TOKEN
+# kind -> shared token, or None when the value varies
+SHARED_TOKENS = [KINDS.get(kind) for kind in range(max(Tokens) + 1)]
+KIND_TYPES = [Tokens(kind) if kind in Tokens._value2member_map_ else None for kind in range(max(Tokens) + 1)]
+# lexeme -> kind as a plain int, which array stores without a conversion
+KEYWORD_KINDS = {name: int(token.type) for name, token in RESERVED_KEYWORDS.items()}
+FIXED_KINDS = {lexeme: int(token.type) for lexeme, token in FIXED_TOKENS.items()}
+# source characters per token, a little under the usual, so the first
+# allocation mostly suffices and rarely wastes much
+CHARS_PER_TOKEN = 4
+
+
+class TokenBuffer:
+    # Token kinds, values and start offsets in parallel arrays. Values are
+    # only kept for kinds that have no shared token.
+    def __init__(self):
+        self.kinds = array('B')
+        self.values = []
+        self.offsets = array('q')
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def fill(self, text):
+        # The arrays are allocated up front from the length of the text,
+        # doubled when that falls short, and trimmed at the end.
+        size = len(text) // CHARS_PER_TOKEN + 1
+        kinds = array('B', bytes(size))
+        values = [None] * size
+        offsets = array('q', bytes(8 * size))
+        match = TOKEN_PATTERN.scanner(text).match
+        keywords = KEYWORD_KINDS
+        fixed = FIXED_KINDS
+        integer = int(Tokens.INTEGER)
+        real = int(Tokens.REAL_CONST)
+        identifier = int(Tokens.ID)
+        count = 0
+        end = 0
+        while True:
+            m = match()
+            if m is None:
+                break
+            if count == size:
+                kinds.extend(bytes(size))
+                values.extend([None] * size)
+                offsets.extend(array('q', bytes(8 * size)))
+                size *= 2
+            group = m.lastindex
+            if group == NUMBER_GROUP:
+                value = m.group(group)
+                if '.' in value:
+                    kinds[count] = real
+                    values[count] = float(value)
+                else:
+                    kinds[count] = integer
+                    values[count] = int(value)
+            elif group == ID_GROUP:
+                value = m.group(group)
+                kinds[count] = keywords.get(value, identifier)
+                values[count] = value
+            else:
+                kinds[count] = fixed[m.group(group)]
+            offsets[count] = m.start(group)
+            count += 1
+            end = m.end()
+        end = WHITESPACE_PATTERN.match(text, end).end()
+        if end < len(text):
+            raise Exception('Error parsing input')
+        del kinds[count:]
+        del values[count:]
+        del offsets[count:]
+        self.kinds.extend(kinds)
+        self.values.extend(values)
+        self.offsets.extend(offsets)
+        self.append_eof(end)
+        return self
+
+    def fill_from(self, lexer):
+        # For lexers without offsets, such as StreamLexer.
+        while True:
+            token = lexer.get_next_token()
+            if token.type == Tokens.EOF:
+                self.append_eof(-1)
+                return self
+            self.kinds.append(token.type)
+            self.values.append(token.value)
+            self.offsets.append(-1)
+
+    def append_eof(self, offset):
+        self.kinds.append(Tokens.EOF)
+        self.values.append(None)
+        self.offsets.append(offset)
+
+    def token(self, index):
+        kind = self.kinds[index]
+        token = SHARED_TOKENS[kind]
+        if token is None:
+            token = Token(KIND_TYPES[kind], self.values[index])
+        return token
+
+
+def tokenize(text):
+    return TokenBuffer().fill(text)
+
+
+class BufferedParser(Parser):
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.kinds = buffer.kinds
+        self.values = buffer.values
+        self.pos = 0
+        self.last = len(buffer.kinds) - 1
+
+    @property
+    def current_token(self):
+        return self.buffer.token(self.pos)
+
+    def eat(self, token_type):
+        if self.kinds[self.pos] == token_type:
+            if self.pos < self.last:
+                self.pos += 1
+        else:
+            self.error()
+
+    def peek(self, k=1):
+        # kind of the token k positions ahead; EOF repeats past the end
+        return KIND_TYPES[self.kinds[min(self.pos + k, self.last)]]
+
+    # The grammar below matches Parser but tests kinds straight from the
+    # buffer, materializing a Token only when a node keeps one.
+
+    def factor(self):
+        kind = self.kinds[self.pos]
+        if kind == Tokens.PLUS or kind == Tokens.MINUS:
+            token = SHARED_TOKENS[kind]
+            self.pos += 1
+            return UnaryOp(token, self.factor())
+        elif kind in NUMBER_CONSTS:
+            token = self.buffer.token(self.pos)
+            self.pos += 1
+            return Num(token)
+        elif kind == Tokens.LPAREN:
+            self.pos += 1
+            node = self.expr()
+            self.eat(Tokens.RPAREN)
+            return node
+        else:
+            node = self.variable()
+            if self.kinds[self.pos] == Tokens.LPAREN:
+                return self.call(node.token)
+            return node
+
+    def term(self):
+        kinds = self.kinds
+        node = self.factor()
+        while kinds[self.pos] in TERM_OPS:
+            token = SHARED_TOKENS[kinds[self.pos]]
+            self.pos += 1
+            node = BinOp(node, token, self.factor())
+        return node
+
+    def expr(self):
+        kinds = self.kinds
+        node = self.term()
+        while kinds[self.pos] in EXPR_OPS:
+            token = SHARED_TOKENS[kinds[self.pos]]
+            self.pos += 1
+            node = BinOp(node, token, self.term())
+        return node
+
+    def statement_list(self):
+        kinds = self.kinds
+        results = [self.statement()]
+        while kinds[self.pos] == Tokens.SEMI:
+            self.pos += 1
+            results.append(self.statement())
+        if kinds[self.pos] == Tokens.ID:
+            self.error()
+        return results
+
+    def statement(self):
+        kind = self.kinds[self.pos]
+        if kind == Tokens.BEGIN:
+            return self.compound_statement()
+        elif kind == Tokens.ID:
+            if self.peek() == Tokens.ASSIGN:
+                return self.assignment_statement()
+            return self.call(self.variable().token)
+        return self.empty()
+
+    def assignment_statement(self, left=None):
+        if left is None:
+            left = self.variable()
+        self.eat(Tokens.ASSIGN)
+        return Assign(left, FIXED_TOKENS[':='], self.expr())
+
+    def variable(self):
+        if self.kinds[self.pos] != Tokens.ID:
+            self.error()
+        node = Var(Token(Tokens.ID, self.values[self.pos]))
+        self.pos += 1
+        return node
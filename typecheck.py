@@ -0,0 +1,93 @@
+from tokens import Tokens
+from interpreter import NodeVisitor
+
+
+INTEGER = 'INTEGER'
+REAL = 'REAL'
+
+
+class TypeChecker(NodeVisitor):
+    def __init__(self):
+        # declared VAR types; None for programs without declarations, whose
+        # variables take the type of the assignment that reaches each read
+        self.declared = None
+        self.current = {}
+        self.types = {}
+
+    def check(self, tree):
+        self.visit(tree)
+        return self.types
+
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        self.declared = {}
+        for declaration in node.declarations:
+            self.visit(declaration)
+        self.visit(node.compound_statement)
+
+    def visit_VarDecl(self, node):
+        name = node.var_node.value
+        if name in self.declared:
+            raise Exception('Duplicate identifier {!r}'.format(name))
+        self.declared[name] = node.type_node.value
+
+    def visit_ProcedureDecl(self, node):
+        raise Exception('procedures are not supported here')
+
+    def visit_Compound(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_Call(self, node):
+        raise Exception('procedure calls are not supported here')
+
+    def visit_NoOp(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        value_type = self.visit(node.right)
+        name = node.left.value
+        if self.declared is None:
+            target = value_type
+        else:
+            if name not in self.declared:
+                raise NameError(repr(name))
+            target = self.declared[name]
+            if target == INTEGER and value_type == REAL:
+                raise TypeError('cannot assign REAL to INTEGER variable {!r}'.format(name))
+        self.current[name] = target
+        self.types[node] = target
+        return target
+
+    def visit_Var(self, node):
+        if node.value not in self.current:
+            raise NameError(repr(node.value))
+        self.types[node] = self.current[node.value]
+        return self.types[node]
+
+    def visit_Num(self, node):
+        self.types[node] = REAL if isinstance(node.value, float) else INTEGER
+        return self.types[node]
+
+    def visit_BinOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op.type
+        if op == Tokens.DIV:
+            result = REAL
+        elif op == Tokens.INTEGER_DIV:
+            if left != INTEGER or right != INTEGER:
+                raise TypeError('DIV needs INTEGER operands')
+            result = INTEGER
+        elif left == INTEGER and right == INTEGER:
+            result = INTEGER
+        else:
+            result = REAL
+        self.types[node] = result
+        return result
+
+    def visit_UnaryOp(self, node):
+        self.types[node] = self.visit(node.expr)
+        return self.types[node]
@@ -0,0 +1,204 @@
+from calc2 import Lexer, Parser, NodeVisitor, Tokens, BINARY_OPS, UNARY_OPS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+CHUNK_SIZE = 64 * 1024
+
+# With NumPy, arithmetic follows the column dtypes rather than Python's:
+# float division by zero gives inf or nan instead of raising, and int64
+# would wrap silently past 2**63. So integer columns are evaluated as
+# Python ints (object arrays) whenever IntegerBound cannot rule out that
+# wrap, which is exact but several times slower.
+INT64_LIMIT = 2 ** 63
+
+SOURCE_OPS = {
+    Tokens.PLUS: '+',
+    Tokens.MINUS: '-',
+    Tokens.MUL: '*',
+    Tokens.DIV: '/',
+}
+
+
+class VariableCollector(NodeVisitor):
+    def __init__(self):
+        self.names = []
+
+    def visit_BinOp(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+
+    def visit_UnaryOp(self, node):
+        self.visit(node.expr)
+
+    def visit_Num(self, node):
+        pass
+
+    def visit_Var(self, node):
+        if node.value not in self.names:
+            self.names.append(node.value)
+
+
+def as_float(value):
+    if isinstance(value, np.ndarray) and value.dtype == object:
+        return value.astype(np.float64)
+    return value
+
+
+class IntegerBound(NodeVisitor):
+    # The largest magnitude any integer subexpression can reach, given the
+    # largest magnitude in each integer column; None marks float results.
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.largest = 0
+
+    def visit_BinOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if left is None or right is None or node.op.type == Tokens.DIV:
+            return None
+        bound = left * right if node.op.type == Tokens.MUL else left + right
+        self.largest = max(self.largest, bound)
+        return bound
+
+    def visit_UnaryOp(self, node):
+        return self.visit(node.expr)
+
+    def visit_Num(self, node):
+        self.largest = max(self.largest, abs(node.value))
+        return abs(node.value)
+
+    def visit_Var(self, node):
+        return self.bounds[node.value]
+
+
+class ArrayEvaluator(NodeVisitor):
+    # Every node becomes one whole-array operation on the current chunk.
+    def __init__(self, columns):
+        self.columns = columns
+
+    def visit_BinOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if node.op.type == Tokens.DIV:
+            # Python ints divide as int64 columns do, into IEEE float64
+            left, right = as_float(left), as_float(right)
+        return BINARY_OPS[node.op.type](left, right)
+
+    def visit_UnaryOp(self, node):
+        return UNARY_OPS[node.op.type](self.visit(node.expr))
+
+    def visit_Num(self, node):
+        return node.value
+
+    def visit_Var(self, node):
+        return self.columns[node.value]
+
+
+class SourceCompiler(NodeVisitor):
+    def __init__(self, names):
+        self.arguments = {name: 'v{}'.format(i) for i, name in enumerate(names)}
+
+    def compile(self, tree):
+        source = 'lambda {}: {}'.format(', '.join(self.arguments.values()), self.visit(tree))
+        return eval(compile(source, '<formula>', 'eval'))
+
+    def visit_BinOp(self, node):
+        return '({} {} {})'.format(self.visit(node.left), SOURCE_OPS[node.op.type], self.visit(node.right))
+
+    def visit_UnaryOp(self, node):
+        return '({}{})'.format(SOURCE_OPS[node.op.type], self.visit(node.expr))
+
+    def visit_Num(self, node):
+        return repr(node.value)
+
+    def visit_Var(self, node):
+        return self.arguments[node.value]
+
+
+class Formula:
+    def __init__(self, text):
+        self.text = text
+        self.tree = Parser(Lexer(text)).parse()
+        collector = VariableCollector()
+        collector.visit(self.tree)
+        self.variables = collector.names
+        self.function = None
+
+    def row_function(self):
+        if self.function is None:
+            try:
+                self.function = SourceCompiler(self.variables).compile(self.tree)
+            except (SyntaxError, RecursionError, MemoryError):
+                # CPython limits how deeply generated expressions may nest
+                self.function = lambda *values: ArrayEvaluator(dict(zip(self.variables, values))).visit(self.tree)
+        return self.function
+
+    def columns(self, variables):
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise NameError(repr(missing[0]))
+        columns = [variables[name] for name in self.variables]
+        lengths = set(len(column) for column in columns)
+        if len(lengths) > 1:
+            raise ValueError('columns differ in length')
+        return columns, lengths.pop() if lengths else 1
+
+    def may_overflow(self, columns):
+        bounds = {}
+        for name, column in zip(self.variables, columns):
+            if column.dtype.kind not in 'iub':
+                bounds[name] = None
+            elif len(column):
+                # as Python ints, since abs() of the smallest int64 wraps
+                bounds[name] = max(int(column.max()), -int(column.min()))
+            else:
+                bounds[name] = 0
+        bound = IntegerBound(bounds)
+        bound.visit(self.tree)
+        return bound.largest >= INT64_LIMIT
+
+    def evaluate_chunks(self, variables, chunk_size=CHUNK_SIZE):
+        columns, rows = self.columns(variables)
+        if np is not None:
+            columns = [np.asarray(column) for column in columns]
+            if self.may_overflow(columns):
+                columns = [column.astype(object) if column.dtype.kind in 'iub' else column
+                           for column in columns]
+        else:
+            function = self.row_function()
+        for start in range(0, rows, chunk_size):
+            stop = min(start + chunk_size, rows)
+            chunk = [column[start:stop] for column in columns]
+            if np is not None:
+                evaluator = ArrayEvaluator(dict(zip(self.variables, chunk)))
+                result = evaluator.visit(self.tree)
+                yield np.broadcast_to(result, (stop - start,))
+            else:
+                if chunk:
+                    yield list(map(function, *chunk))
+                else:
+                    yield [function()] * (stop - start)
+
+    def evaluate(self, variables=None, chunk_size=CHUNK_SIZE, **columns):
+        # Chunks keep intermediate arrays small enough to stay in cache.
+        if variables is None:
+            variables = columns
+        chunks = self.evaluate_chunks(variables, chunk_size)
+        if np is not None:
+            _, rows = self.columns(variables)
+            result = None
+            start = 0
+            for chunk in chunks:
+                if result is None:
+                    result = np.empty(rows, dtype=np.result_type(chunk))
+                result[start:start + len(chunk)] = chunk
+                start += len(chunk)
+            return result if result is not None else np.empty(0)
+        result = []
+        for chunk in chunks:
+            result.extend(chunk)
+        return result
@@ -0,0 +1,171 @@
+import marshal
+from array import array
+from tokens import Tokens
+from interpreter import NodeVisitor, integer_div
+
+
+LOAD_CONST = 0
+LOAD_VAR = 1
+STORE_VAR = 2
+ADD = 3
+SUB = 4
+MUL = 5
+DIV = 6
+NEG = 7
+POS = 8
+INTEGER_DIV = 9
+
+BINARY_OPCODES = {
+    Tokens.PLUS: ADD,
+    Tokens.MINUS: SUB,
+    Tokens.MUL: MUL,
+    Tokens.DIV: DIV,
+    Tokens.INTEGER_DIV: INTEGER_DIV,
+}
+UNARY_OPCODES = {
+    Tokens.PLUS: POS,
+    Tokens.MINUS: NEG,
+}
+
+
+class Code:
+    def __init__(self, instructions, constants, names):
+        self.instructions = instructions
+        self.constants = constants
+        self.names = names
+
+    def dumps(self):
+        return marshal.dumps((self.instructions.tobytes(), self.constants, self.names))
+
+    @classmethod
+    def loads(cls, data):
+        raw, constants, names = marshal.loads(data)
+        instructions = array('i')
+        instructions.frombytes(raw)
+        return cls(instructions, constants, names)
+
+
+class BytecodeCompiler(NodeVisitor):
+    def __init__(self):
+        self.instructions = array('i')
+        self.constants = []
+        self.constant_index = {}
+        self.names = []
+        self.slots = {}
+
+    def compile(self, tree):
+        self.visit(tree)
+        return Code(self.instructions, self.constants, self.names)
+
+    def slot(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+        return slot
+
+    def visit_BinOp(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+        self.instructions.append(BINARY_OPCODES[node.op.type])
+
+    def visit_UnaryOp(self, node):
+        self.visit(node.expr)
+        self.instructions.append(UNARY_OPCODES[node.op.type])
+
+    def visit_Num(self, node):
+        # keyed by type too, so that 1 and 1.0 keep separate entries
+        key = (type(node.value), node.value)
+        index = self.constant_index.get(key)
+        if index is None:
+            index = self.constant_index[key] = len(self.constants)
+            self.constants.append(node.value)
+        self.instructions.extend((LOAD_CONST, index))
+
+    def visit_Program(self, node):
+        self.visit(node.block)
+
+    def visit_Block(self, node):
+        self.visit(node.compound_statement)
+
+    def visit_Compound(self, node):
+        for child in node.children:
+            self.visit(child)
+
+    def visit_NoOp(self, node):
+        pass
+
+    def visit_Assign(self, node):
+        self.visit(node.right)
+        self.instructions.extend((STORE_VAR, self.slot(node.left.value)))
+
+    def visit_Var(self, node):
+        self.instructions.extend((LOAD_VAR, self.slot(node.value)))
+
+    def visit_Call(self, node):
+        raise Exception('procedure calls are not supported here')
+
+
+class VM:
+    def run(self, code):
+        instructions = code.instructions
+        constants = code.constants
+        slots = [None] * len(code.names)
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        end = len(instructions)
+        while pc < end:
+            op = instructions[pc]
+            if op == LOAD_VAR:
+                value = slots[instructions[pc + 1]]
+                if value is None:
+                    raise NameError(repr(code.names[instructions[pc + 1]]))
+                push(value)
+                pc += 2
+            elif op == LOAD_CONST:
+                push(constants[instructions[pc + 1]])
+                pc += 2
+            elif op == STORE_VAR:
+                slots[instructions[pc + 1]] = pop()
+                pc += 2
+            else:
+                if op == NEG:
+                    stack[-1] = -stack[-1]
+                elif op == POS:
+                    stack[-1] = +stack[-1]
+                else:
+                    right = pop()
+                    if op == ADD:
+                        stack[-1] += right
+                    elif op == SUB:
+                        stack[-1] -= right
+                    elif op == MUL:
+                        stack[-1] *= right
+                    elif op == DIV:
+                        stack[-1] /= right
+                    elif op == INTEGER_DIV:
+                        stack[-1] = integer_div(stack[-1], right)
+                pc += 1
+        return {name: value for name, value in zip(code.names, slots) if value is not None}
+
+
+class VMInterpreter:
+    def __init__(self, parser):
+        self.parser = parser
+        self.code = None
+        self.GLOBAL_SCOPE = {}
+
+    def run(self, code):
+        self.code = code
+        self.GLOBAL_SCOPE = VM().run(code)
+
+    def execute(self, tree):
+        self.run(BytecodeCompiler().compile(tree))
+
+    def interpret(self):
+        if self.code is None:
+            self.execute(self.parser.parse())
+        else:
+            self.run(self.code)